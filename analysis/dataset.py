@@ -0,0 +1,146 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# repeat thousands of times in a snapshot
+CATEGORICAL_COLUMNS = [
+    'AGENCY', 'Organization Type', 'Reason For Modification', 'NAICS Code Description',
+    'Principal NAICS Code', 'agencyID', 'modNumber', 'idvAgencyID', 'contractType',
+]
+
+# mostly distinct within one snapshot but repeated across snapshots, so they are
+# dictionary-encoded too: a year of history stores each distinct value once
+INTERNED_COLUMNS = [
+    'DESCRIPTION', 'Legal Business Name', 'Doing Business As Name', 'Unique Entity Identifier',
+    'cage Code', 'PIID', 'idvPIID',
+]
+
+# query parameters of a viewLinkController.jsp link, in the order FPDS writes them
+LINK_PARAMS = ['agencyID', 'PIID', 'modNumber', 'idvAgencyID', 'idvPIID', 'contractType']
+LINK_PREFIX = 'https://www.fpds.gov/ezsearch/jsp/viewLinkController.jsp?'
+
+
+def _split_links(links):
+    # links that aren't viewLinkController.jsp links (e.g. portal searches) are kept whole in LINK_OTHER
+    links = links.astype('string')
+    parsed = links.str.startswith(LINK_PREFIX).fillna(False)
+    parts = pd.DataFrame(index=links.index)
+    for name in LINK_PARAMS:
+        parts[name] = links.where(parsed).str.extract(rf'[?&]{name}=([^&]*)', expand=False)
+    parts['LINK_OTHER'] = links.where(~parsed)
+    return parts
+
+
+def rebuild_links(df):
+    """Full LINK URLs for a compact dataset (the inverse of the LINK split)."""
+    parts = [df[name].astype('string') for name in LINK_PARAMS]
+    links = LINK_PREFIX + parts[0].radd(f'{LINK_PARAMS[0]}=')
+    for name, values in zip(LINK_PARAMS[1:], parts[1:]):
+        links = links + f'&{name}=' + values
+    return links.fillna(df['LINK_OTHER'].astype('string'))
+
+
+def _report_unparsed(column, raw, parsed):
+    # values that were present but failed to parse; they are kept as missing/0, never dropped silently
+    bad = raw.notna() & raw.astype('string').str.strip().ne('') & parsed.isna()
+    if bad.any():
+        examples = ', '.join(repr(v) for v in raw[bad].unique()[:5])
+        print(f'[WARN] {column}: {int(bad.sum())} value(s) could not be parsed, e.g. {examples}')
+
+
+def compact_contracts(df):
+    """
+    Convert an enriched contracts frame (as read from CSV) to the compact
+    layout: categorical text columns, LINK split into its FPDS parameters,
+    UPLOADED ON as datetime64 (m/d/Y or ISO) and VALUE as int64 dollars
+    (missing -> 0). Values that don't parse are reported.
+    """
+    df = df.copy()
+    if 'LINK' in df.columns:
+        position = df.columns.get_loc('LINK')
+        parts = _split_links(df.pop('LINK'))
+        for offset, name in enumerate(parts.columns):
+            df.insert(position + offset, name, parts[name])
+    if 'VALUE' in df.columns:
+        values = pd.to_numeric(df['VALUE'], errors='coerce')
+        _report_unparsed('VALUE', df['VALUE'], values)
+        df['VALUE'] = values.fillna(0).round().astype(np.int64)
+    if 'UPLOADED ON' in df.columns:
+        # the scraped page has 2/13/2025, files written through normalize_table have 2025-02-13
+        dates = pd.to_datetime(df['UPLOADED ON'], format='mixed', errors='coerce')
+        _report_unparsed('UPLOADED ON', df['UPLOADED ON'], dates)
+        df['UPLOADED ON'] = dates
+    if 'Principal NAICS Code' in df.columns:
+        df['Principal NAICS Code'] = df['Principal NAICS Code'].astype('string').str.replace(r'\.0+$', '', regex=True)
+    for column in CATEGORICAL_COLUMNS + INTERNED_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    if 'LINK_OTHER' in df.columns:
+        df['LINK_OTHER'] = df['LINK_OTHER'].astype('category')
+    return df
+
+
+def load_contracts(source):
+    """Load one enriched contracts CSV (or a DataFrame of its text) in the compact layout."""
+    if isinstance(source, pd.DataFrame):
+        return compact_contracts(source)
+    return compact_contracts(pd.read_csv(source, dtype=str))
+
+
+def concat_compact(frames):
+    """
+    Stack compact frames, merging their categories instead of falling back
+    to object dtype the way pd.concat does when the categories differ.
+    """
+    frames = list(frames)
+    columns = list(dict.fromkeys(c for f in frames for c in f.columns))
+    combined = {}
+    for column in columns:
+        pieces = [
+            f[column] if column in f.columns else pd.Series(pd.Categorical([None] * len(f)))
+            for f in frames
+        ]
+        if all(isinstance(piece.dtype, pd.CategoricalDtype) for piece in pieces):
+            combined[column] = pd.Series(union_categoricals(pieces))
+        else:
+            combined[column] = pd.concat(pieces, ignore_index=True)
+    return pd.DataFrame(combined)
+
+
+def load_history(sources):
+    """
+    Load several snapshots into one compact frame with a categorical
+    'snapshot' column. sources is a list of paths (labelled by file name) or
+    a dict of label -> path or DataFrame.
+    """
+    if not isinstance(sources, dict):
+        sources = {os.path.basename(path): path for path in sources}
+    frames = []
+    for label, source in sources.items():
+        frame = load_contracts(source)
+        frame.insert(0, 'snapshot', pd.Categorical([label] * len(frame)))
+        frames.append(frame)
+    return concat_compact(frames)
+
+
+def memory_report(df):
+    """Bytes per column (deep, including string payloads), largest first, with a total row."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[c].dtype) for c in usage.index],
+        'bytes': usage.to_numpy(),
+    }).sort_values('bytes', ascending=False, ignore_index=True)
+    total = pd.DataFrame({'column': ['(total)'], 'dtype': [''], 'bytes': [usage.sum()]})
+    return pd.concat([report, total], ignore_index=True)
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:] or ['contracts_with_extracted_fields.csv']
+    raw = sum(pd.read_csv(path).memory_usage(deep=True).sum() for path in paths)
+    compact = load_history(paths)
+    print(memory_report(compact).to_string(index=False))
+    print(f'\ndefault read_csv: {raw / 1e6:.1f} MB, compact: {compact.memory_usage(deep=True).sum() / 1e6:.1f} MB')
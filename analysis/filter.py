@@ -1,23 +1,37 @@
 import pandas as pd
 
-#read contracts_selenium_data.csv
-
-df = pd.read_csv('contracts_selenium_data.csv')
-# 
 # AGENCY,DESCRIPTION,UPLOADED ON,LINK,VALUE
 # filter for not containing SUBSCRIPTION, ANNUAL RENEW, LICENSES, SOFTWARE in DESCRIPTION
+EXCLUDED_KEYWORDS = ['SUBSCRIPTION', 'ANNUAL RENEW', 'LICENSES', 'SOFTWARE']
+
+# countries used to build filtered_contracts_latam.csv
+LATAM_KEYWORDS = [
+    'ARGENTINA', 'BOLIVIA', 'BRAZIL', 'CHILE', 'COLOMBIA', 'COSTA RICA', 'DOMINICAN REPUBLIC',
+    'ECUADOR', 'EL SALVADOR', 'GUATEMALA', 'HAITI', 'HONDURAS', 'MEXICO', 'NICARAGUA',
+    'PANAMA', 'PARAGUAY', 'PERU', 'URUGUAY', 'VENEZUELA',
+]
+
+
+def filter_contracts(input_file='contracts_selenium_data.csv', output_file='contracts_filtered.csv'):
+    #read contracts_selenium_data.csv
+    df = pd.read_csv(input_file)
+
+    df_filtered = df[~df['DESCRIPTION'].str.contains('|'.join(EXCLUDED_KEYWORDS), case=False, na=False)]
+
+    # save to contracts_filtered.csv
+    df_filtered.to_csv(output_file, index=False)
 
-df_filtered = df[~df['DESCRIPTION'].str.contains('SUBSCRIPTION|ANNUAL RENEW|LICENSES|SOFTWARE', case=False, na=False)]
+    #get count of total rows and filtered rows
+    total_rows = df.shape[0]
+    filtered_rows = df_filtered.shape[0]
+    print(f"Total rows: {total_rows}")
+    print(f"Filtered rows: {filtered_rows}")
 
-# save to contracts_filtered.csv
-df_filtered.to_csv('contracts_filtered.csv', index=False)
+    #get unique agencies
+    unique_agencies = df_filtered['AGENCY'].unique()
+    print(f"Unique agencies: {len(unique_agencies)}")
+    return df_filtered
 
-#get count of total rows and filtered rows
-total_rows = df.shape[0]
-filtered_rows = df_filtered.shape[0]
-print(f"Total rows: {total_rows}")
-print(f"Filtered rows: {filtered_rows}")
 
-#get unique agencies
-unique_agencies = df_filtered['AGENCY'].unique()
-print(f"Unique agencies: {len(unique_agencies)}")
+if __name__ == "__main__":
+    filter_contracts()
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from filter import EXCLUDED_KEYWORDS, LATAM_KEYWORDS
+
+# bump whenever a report function or the filter keywords change, so cached
+# results computed with the old rules are not reused
+RULE_VERSION = 1
+
+DEFAULT_CACHE_DIR = '.report_cache'
+
+
+def _numeric_value(df):
+    return pd.to_numeric(df['VALUE'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+
+
+def _keyword_hits(descriptions, keywords):
+    # one boolean column per keyword, stacked so counts come from a single sum
+    text = descriptions.fillna('').str.upper()
+    return np.column_stack([text.str.contains(k, regex=False).to_numpy() for k in keywords])
+
+
+def top_agencies(df, top=25):
+    values = _numeric_value(df)
+    grouped = pd.DataFrame({'AGENCY': df['AGENCY'], 'VALUE': values}).groupby('AGENCY')['VALUE']
+    report = grouped.agg(total_value='sum', contracts='size').sort_values('total_value', ascending=False)
+    return report.head(top).reset_index()
+
+
+def naics_distribution(df):
+    codes = df['Principal NAICS Code'].astype('string').str.strip().str.replace(r'\.0+$', '', regex=True)
+    frame = pd.DataFrame({
+        'NAICS': codes.fillna('UNKNOWN'),
+        'description': df['NAICS Code Description'].astype('string').str.strip(),
+        'VALUE': _numeric_value(df),
+    })
+    report = frame.groupby('NAICS').agg(
+        description=('description', 'first'),
+        contracts=('VALUE', 'size'),
+        total_value=('VALUE', 'sum'),
+    )
+    report['share'] = report['contracts'] / report['contracts'].sum()
+    return report.sort_values('contracts', ascending=False).reset_index()
+
+
+def foreign_government_vendors(df):
+    mask = df['Organization Type'].astype('string').str.strip().eq('FOREIGN GOVERNMENT').fillna(False)
+    columns = ['AGENCY', 'DESCRIPTION', 'Legal Business Name', 'Unique Entity Identifier', 'VALUE', 'LINK']
+    return df.loc[mask.to_numpy(), [c for c in columns if c in df.columns]].reset_index(drop=True)
+
+
+def filter_hits(df):
+    keywords = EXCLUDED_KEYWORDS + LATAM_KEYWORDS
+    hits = _keyword_hits(df['DESCRIPTION'], keywords)
+    values = _numeric_value(df)
+    excluded = hits[:, :len(EXCLUDED_KEYWORDS)].any(axis=1)
+    latam = hits[:, len(EXCLUDED_KEYWORDS):].any(axis=1) & ~excluded
+    report = pd.DataFrame({
+        'rule': ['excluded'] * len(EXCLUDED_KEYWORDS) + ['latam'] * len(LATAM_KEYWORDS),
+        'keyword': keywords,
+        'hits': hits.sum(axis=0),
+        'value': values @ hits,
+    })
+    totals = pd.DataFrame({
+        'rule': ['excluded', 'kept', 'latam'],
+        'keyword': ['(any)', '(any)', '(any, after filter)'],
+        'hits': [excluded.sum(), (~excluded).sum(), latam.sum()],
+        'value': [values[excluded].sum(), values[~excluded].sum(), values[latam].sum()],
+    })
+    report = pd.concat([report, totals], ignore_index=True)
+    report['unique_agencies'] = pd.NA
+    report.loc[report['rule'] == 'kept', 'unique_agencies'] = df.loc[~excluded, 'AGENCY'].nunique()
+    return report
+
+
+REPORTS = {
+    'top_agencies': top_agencies,
+    'naics_distribution': naics_distribution,
+    'foreign_government_vendors': foreign_government_vendors,
+    'filter_hits': filter_hits,
+}
+
+
+def file_hash(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    sha256 of the file contents. The digest is remembered by path, size and
+    mtime, so an unchanged input isn't read again on the next run.
+    """
+    stat = os.stat(path)
+    index_file = os.path.join(cache_dir, 'file_hashes.json')
+    index = {}
+    if os.path.exists(index_file):
+        with open(index_file) as f:
+            index = json.load(f)
+    entry = index.get(os.path.abspath(path))
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    index[os.path.abspath(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_file, 'w') as f:
+        json.dump(index, f)
+    return digest.hexdigest()
+
+
+def report_key(name, input_hash):
+    return hashlib.sha256(f'{name}|{input_hash}|{RULE_VERSION}'.encode()).hexdigest()[:16]
+
+
+def generate_reports(input_file='contracts_with_extracted_fields.csv', names=None, cache_dir=DEFAULT_CACHE_DIR, force=False):
+    """
+    Compute the standard reports for an enriched contracts CSV.
+    Each result is cached under cache_dir, keyed by the input's content hash
+    and RULE_VERSION; only reports without a valid cache entry are computed,
+    and the CSV is only read if at least one of them needs it.
+    Returns a dict of report name -> DataFrame.
+    """
+    names = names or list(REPORTS)
+    unknown = [name for name in names if name not in REPORTS]
+    if unknown:
+        raise ValueError(f'Unknown report(s): {", ".join(unknown)}. Available: {", ".join(REPORTS)}')
+    os.makedirs(cache_dir, exist_ok=True)
+    input_hash = file_hash(input_file, cache_dir)
+
+    results = {}
+    missing = []
+    for name in names:
+        cache_file = os.path.join(cache_dir, f'{name}-{report_key(name, input_hash)}.pkl')
+        if not force and os.path.exists(cache_file):
+            results[name] = pd.read_pickle(cache_file)
+            print(f'{name}: cached')
+        else:
+            missing.append((name, cache_file))
+
+    if missing:
+        df = pd.read_csv(input_file, dtype={'Principal NAICS Code': str})
+        for name, cache_file in missing:
+            results[name] = REPORTS[name](df)
+            results[name].to_pickle(cache_file)
+            print(f'{name}: computed')
+    return {name: results[name] for name in names}
+
+
+if __name__ == '__main__':
+    for name, report in generate_reports().items():
+        print(f'\n{name}')
+        print(report.head(10))
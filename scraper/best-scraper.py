@@ -1,22 +1,22 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import re
 import json
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import os
 import time
 
+from normalize import SCHEMAS, normalize_table, report_issues
+from parsing import parse_pages, parse_tables
+from snapshots import SnapshotStore
+from writers import IncrementalWriter
+
 
 def follow_redirect(driver, url):
     """
     Open the URL in a new tab, wait for redirection to occur, then retrieve
     the final URL.
     """
+    from selenium.webdriver.support.ui import WebDriverWait
+
     current_window = driver.current_window_handle
     # Open new tab with the provided URL
     driver.execute_script("window.open(arguments[0]);", url)
@@ -53,18 +53,8 @@ def extract_embedded_json_improved(html_text):
             "vendor",
             "description",
         ]
-        df = pd.DataFrame(contracts, columns=columns)
-        # Clean up numeric values
-        for col in ["ceiling_value", "value"]:
-            df[col] = (
-                df[col]
-                .str.replace(",", "")
-                .str.replace("$", "")
-                .str.strip()
-            )
-            # Convert to numeric
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        return df
+        # Amounts and dates are parsed later by normalize_table
+        return pd.DataFrame(contracts, columns=columns)
 
     # If the specific pattern doesn't match, try a more general approach
     json_pattern = r'self\.__next_f\.push\(\[1,"([^"]+)"\]\)'
@@ -77,25 +67,35 @@ def extract_embedded_json_improved(html_text):
             )
             agency_matches = re.findall(agency_pattern, combined_data)
             if agency_matches:
-                df = pd.DataFrame(
+                return pd.DataFrame(
                     agency_matches,
                     columns=["agency", "ceiling_value", "value"],
                 )
-                for col in ["ceiling_value", "value"]:
-                    df[col] = (
-                        df[col]
-                        .str.replace(",", "")
-                        .str.replace("$", "")
-                        .str.strip()
-                    )
-                    df[col] = pd.to_numeric(df[col], errors="coerce")
-                return df
         except Exception as e:
             print(f"Error parsing JSON data: {e}")
 
     return pd.DataFrame()  # Return empty DataFrame if no data found
 
 
+def normalize_results(results):
+    """
+    Run the column-wise normalization stage over every scraped table.
+    Returns (normalized_results, issues) where issues maps table name to the
+    DataFrame of values that failed validation.
+    """
+    normalized = {}
+    issues = {}
+    for table_name, df in results.items():
+        if table_name not in SCHEMAS or df.empty:
+            normalized[table_name] = df
+            continue
+        normalized[table_name], table_issues = normalize_table(df, table_name)
+        report_issues(table_name, table_issues)
+        if not table_issues.empty:
+            issues[table_name] = table_issues
+    return normalized, issues
+
+
 def extract_contracts_via_javascript(driver):
     """Try to extract contract data directly via JavaScript execution"""
     try:
@@ -119,8 +119,102 @@ def extract_contracts_via_javascript(driver):
     return pd.DataFrame()
 
 
-def scrape_with_selenium():
-    """Use Selenium to scrape the page, which can handle JavaScript-rendered content"""
+# Sections of the savings page, the button that expands each table, and
+# whether its links should be followed through the FPDS redirect.
+SELENIUM_SECTIONS = [
+    {"name": "Contracts", "button": "View All Contracts", "follow_links": True},
+    {"name": "Grants", "button": "View All Grants", "follow_links": False},
+    {"name": "Real Estate", "button": "View All Leases", "follow_links": False},
+]
+
+
+def selenium_output_file(table_name, output_dir="."):
+    return os.path.join(
+        output_dir, f"{table_name.lower().replace(' ', '_')}_selenium_data.csv"
+    )
+
+
+def extract_table_with_selenium(driver, section, writer_for):
+    """
+    Expand one section of the page and stream its rows to a writer as they
+    are read, instead of holding the whole table in memory.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    table_name = section["name"]
+    # Check if there's a "View All" button and click it
+    try:
+        view_all = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable(
+                (By.XPATH, f"//button[contains(text(), '{section['button']}')]")
+            )
+        )
+        view_all.click()
+        print(f"Clicked '{section['button']}' button")
+        time.sleep(3)  # Wait for all rows to load
+    except Exception as e:
+        print(f"Could not find or click '{section['button']}' button: {e}")
+
+    try:
+        section_heading = driver.find_element(
+            By.XPATH, f"//h2[contains(text(), '{table_name}')]"
+        )
+        table = section_heading.find_element(By.XPATH, "./following::table[1]")
+        # Extract headers
+        headers = [th.text.strip() for th in table.find_elements(By.TAG_NAME, "th")]
+        writer = writer_for(table_name, headers)
+        for tr in table.find_elements(By.XPATH, ".//tbody/tr"):
+            row = {}
+            cells = tr.find_elements(By.TAG_NAME, "td")
+            for i, td in enumerate(cells):
+                if i < len(headers):
+                    links = (
+                        td.find_elements(By.TAG_NAME, "a")
+                        if section["follow_links"]
+                        else []
+                    )
+                    if links:
+                        link = links[0].get_attribute("href")
+                        # If this is an intermediary link that needs redirection,
+                        # follow it to obtain the final URL.
+                        if "viewLinkController.jsp" in link:
+                            try:
+                                link = follow_redirect(driver, link)
+                            except Exception as ex:
+                                print("Redirection failed:", ex)
+                        row[headers[i]] = link
+                    elif td.get_attribute("title"):
+                        row[headers[i]] = td.get_attribute("title")
+                    else:
+                        # Amounts are kept as text and parsed column-wise
+                        # by normalize_table as each batch is written.
+                        row[headers[i]] = td.text.strip()
+            if row:
+                writer.write(row)
+        writer.finalize()
+        print(f"Extracted {writer.rows_written} {table_name.lower()} rows from HTML table")
+        return writer
+    except Exception as e:
+        print(f"Error extracting {table_name.lower()} table: {e}")
+        return None
+
+
+def scrape_with_selenium(output_dir=".", sections=None):
+    """
+    Use Selenium to scrape the page, which can handle JavaScript-rendered content.
+    Rows are appended to "<table>_selenium_data.csv" files in output_dir in
+    batches while they are extracted. Returns a dict of table name to the
+    finalized IncrementalWriter (path, rows_written, issues).
+    sections optionally limits the run to the named tables.
+    """
+    # Selenium and the driver manager are slow to import; only load them
+    # when a browser is actually needed.
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     url = "https://doge.gov/savings"
 
     options = webdriver.ChromeOptions()
@@ -133,6 +227,14 @@ def scrape_with_selenium():
         service=Service(ChromeDriverManager().install()), options=options
     )
 
+    def writer_for(table_name, columns=None):
+        return IncrementalWriter(
+            selenium_output_file(table_name, output_dir),
+            columns=columns,
+            schema=SCHEMAS.get(table_name),
+        )
+
+    results = {}
     try:
         driver.get(url)
         # Wait for the page to load completely
@@ -145,182 +247,26 @@ def scrape_with_selenium():
             print(
                 f"Successfully extracted {len(js_data)} records directly from JavaScript!"
             )
-        results = {}
-        if not js_data.empty:
-            results["JS_Contracts"] = js_data
-
-        # Check if there's a "View All Contracts" button and click it
-        try:
-            view_all_contracts = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        "//button[contains(text(), 'View All Contracts')]",
-                    )
-                )
-            )
-            view_all_contracts.click()
-            print("Clicked 'View All Contracts' button")
-            time.sleep(3)  # Wait for all contracts to load
-        except Exception as e:
-            print(f"Could not find or click 'View All Contracts' button: {e}")
-
-        # Extract Contracts table
-        try:
-            contracts_section = driver.find_element(
-                By.XPATH, "//h2[contains(text(), 'Contracts')]"
-            )
-            contracts_table = contracts_section.find_element(
-                By.XPATH, "./following::table[1]"
-            )
-            # Extract headers
-            headers = [
-                th.text.strip() for th in contracts_table.find_elements(By.TAG_NAME, "th")
-            ]
-            # Extract all rows
-            rows = []
-            for tr in contracts_table.find_elements(By.XPATH, ".//tbody/tr"):
-                row = {}
-                cells = tr.find_elements(By.TAG_NAME, "td")
-                for i, td in enumerate(cells):
-                    if i < len(headers):
-                        # If the cell has a link
-                        links = td.find_elements(By.TAG_NAME, "a")
-                        if links:
-                            link = links[0].get_attribute("href")
-                            # If this is an intermediary link that needs redirection,
-                            # follow it to obtain the final URL.
-                            if "viewLinkController.jsp" in link:
-                                try:
-                                    link = follow_redirect(driver, link)
-                                except Exception as ex:
-                                    print("Redirection failed:", ex)
-                            row[headers[i]] = link
-                        elif td.get_attribute("title"):
-                            row[headers[i]] = td.get_attribute("title")
-                        else:
-                            cell_text = td.text.strip()
-                            if "$" in cell_text:
-                                value_match = re.search(r"\$\s*([0-9,]+)", cell_text)
-                                if value_match:
-                                    row[headers[i]] = value_match.group(1).replace(
-                                        ",", ""
-                                    )
-                            else:
-                                row[headers[i]] = cell_text
-                if row:
-                    rows.append(row)
-            results["Contracts"] = pd.DataFrame(rows)
-            print(
-                f"Extracted {len(rows)} contract rows from HTML table (with redirection)"
-            )
-        except Exception as e:
-            print(f"Error extracting contracts table: {e}")
-
-        # Try to click "View All Grants" button
-        try:
-            view_all_grants = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//button[contains(text(), 'View All Grants')]")
-                )
-            )
-            view_all_grants.click()
-            print("Clicked 'View All Grants' button")
-            time.sleep(3)
-        except Exception as e:
-            print(f"Could not find or click 'View All Grants' button: {e}")
-
-        # Extract Grants table
-        try:
-            grants_section = driver.find_element(
-                By.XPATH, "//h2[contains(text(), 'Grants')]"
-            )
-            grants_table = grants_section.find_element(
-                By.XPATH, "./following::table[1]"
-            )
-            headers = [
-                th.text.strip() for th in grants_table.find_elements(By.TAG_NAME, "th")
-            ]
-            rows = []
-            for tr in grants_table.find_elements(By.XPATH, ".//tbody/tr"):
-                row = {}
-                cells = tr.find_elements(By.TAG_NAME, "td")
-                for i, td in enumerate(cells):
-                    if i < len(headers):
-                        if td.get_attribute("title"):
-                            row[headers[i]] = td.get_attribute("title")
-                        else:
-                            cell_text = td.text.strip()
-                            if "$" in cell_text:
-                                value_match = re.search(r"\$\s*([0-9,]+)", cell_text)
-                                if value_match:
-                                    row[headers[i]] = value_match.group(1).replace(
-                                        ",", ""
-                                    )
-                            else:
-                                row[headers[i]] = cell_text
-                if row:
-                    rows.append(row)
-            results["Grants"] = pd.DataFrame(rows)
-            print(f"Extracted {len(rows)} grant rows from HTML table")
-        except Exception as e:
-            print(f"Error extracting grants table: {e}")
+            with writer_for("JS_Contracts") as writer:
+                writer.write_frame(js_data)
+            results["JS_Contracts"] = writer
+        del js_data
 
-        # Try to click "View All Leases" button
-        try:
-            view_all_leases = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, "//button[contains(text(), 'View All Leases')]")
-                )
-            )
-            view_all_leases.click()
-            print("Clicked 'View All Leases' button")
-            time.sleep(3)
-        except Exception as e:
-            print(f"Could not find or click 'View All Leases' button: {e}")
-
-        # Extract Real Estate table
-        try:
-            real_estate_section = driver.find_element(
-                By.XPATH, "//h2[contains(text(), 'Real Estate')]"
-            )
-            real_estate_table = real_estate_section.find_element(
-                By.XPATH, "./following::table[1]"
-            )
-            headers = [
-                th.text.strip() for th in real_estate_table.find_elements(By.TAG_NAME, "th")
-            ]
-            rows = []
-            for tr in real_estate_table.find_elements(By.XPATH, ".//tbody/tr"):
-                row = {}
-                cells = tr.find_elements(By.TAG_NAME, "td")
-                for i, td in enumerate(cells):
-                    if i < len(headers):
-                        if td.get_attribute("title"):
-                            row[headers[i]] = td.get_attribute("title")
-                        else:
-                            cell_text = td.text.strip()
-                            if "$" in cell_text:
-                                value_match = re.search(r"\$\s*([0-9,]+)", cell_text)
-                                if value_match:
-                                    row[headers[i]] = value_match.group(1).replace(
-                                        ",", ""
-                                    )
-                            else:
-                                row[headers[i]] = cell_text
-                if row:
-                    rows.append(row)
-            results["Real Estate"] = pd.DataFrame(rows)
-            print(f"Extracted {len(rows)} real estate rows from HTML table")
-        except Exception as e:
-            print(f"Error extracting real estate table: {e}")
+        for section in SELENIUM_SECTIONS:
+            if sections is not None and section["name"] not in sections:
+                continue
+            writer = extract_table_with_selenium(driver, section, writer_for)
+            if writer is not None:
+                results[section["name"]] = writer
 
-        # Try to extract embedded JSON data from page source
+        # Try to extract embedded JSON data from page source. The source is
+        # dropped as soon as the payload has been pulled out of it.
         try:
-            page_source = driver.page_source
-            json_data = extract_embedded_json_improved(page_source)
+            json_data = extract_embedded_json_improved(driver.page_source)
             if isinstance(json_data, pd.DataFrame) and not json_data.empty:
-                results["Embedded_Data"] = json_data
+                with writer_for("Embedded_Data") as writer:
+                    writer.write_frame(json_data)
+                results["Embedded_Data"] = writer
                 print(f"Extracted {len(json_data)} rows from embedded JSON")
         except Exception as e:
             print(f"Error extracting embedded JSON: {e}")
@@ -331,8 +277,26 @@ def scrape_with_selenium():
         driver.quit()
 
 
-def scrape_with_requests():
-    """Use requests and BeautifulSoup to scrape the page"""
+def tables_to_results(tables, html_text):
+    """Turn parsed section rows plus the embedded JSON into the results dict."""
+    results = {}
+    for table_section, rows in tables.items():
+        results[table_section] = pd.DataFrame(rows)
+        print(f"Extracted {len(rows)} {table_section.lower()} rows")
+    json_data = extract_embedded_json_improved(html_text)
+    if isinstance(json_data, pd.DataFrame) and not json_data.empty:
+        results["Embedded_Data"] = json_data
+        print(f"Extracted {len(json_data)} rows from embedded JSON")
+    return results
+
+
+def scrape_with_requests(parser="auto"):
+    """
+    Use requests to fetch the page and parse its tables with the given
+    backend ("lxml", "bs4" or "auto", see parsing.py).
+    """
+    import requests
+
     url = "https://doge.gov/savings"
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -342,73 +306,92 @@ def scrape_with_requests():
     try:
         response = requests.get(url, headers=headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        results = {}
-        for table_section in ["Contracts", "Grants", "Real Estate"]:
-            section = soup.find("h2", string=lambda t: t and table_section in t)
-            if not section:
-                continue
-            table = section.find_next("table")
-            if not table:
-                continue
-            headers_list = [th.text.strip() for th in table.find_all("th")]
-            rows = []
-            for tr in table.find_all("tr")[1:]:
-                row = {}
-                cells = tr.find_all("td")
-                for i, td in enumerate(cells):
-                    if i < len(headers_list):
-                        if td.get("title"):
-                            row[headers_list[i]] = td.get("title")
-                        elif td.find("a"):
-                            row[headers_list[i]] = td.find("a")["href"]
-                        else:
-                            cell_text = td.text.strip()
-                            if "$" in cell_text:
-                                value_match = re.search(r"\$\s*([0-9,]+)", cell_text)
-                                if value_match:
-                                    row[headers_list[i]] = value_match.group(1).replace(
-                                        ",", ""
-                                    )
-                            else:
-                                row[headers_list[i]] = cell_text
-                if row:
-                    rows.append(row)
-            results[table_section] = pd.DataFrame(rows)
-            print(f"Extracted {len(rows)} {table_section.lower()} rows")
-        json_data = extract_embedded_json_improved(response.text)
-        if isinstance(json_data, pd.DataFrame) and not json_data.empty:
-            results["Embedded_Data"] = json_data
-            print(f"Extracted {len(json_data)} rows from embedded JSON")
-        return results
+        return tables_to_results(parse_tables(response.text, parser), response.text)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching the webpage: {e}")
         return None
 
 
-if __name__ == "__main__":
+def scrape_saved_pages(paths, parser="auto", workers=None):
+    """
+    Parse previously saved copies of the savings page in parallel.
+    Returns a dict of path -> results dict.
+    """
+    parsed = parse_pages(paths, parser, workers)
+    results = {}
+    for path, tables in parsed:
+        with open(path, encoding="utf-8") as handle:
+            results[path] = tables_to_results(tables, handle.read())
+    return results
+
+
+def save_results(results, output_dir, prefix=""):
+    """Normalize each table, write it and its validation issues as CSV."""
+    results, issues = normalize_results(results)
+    for table_name, issues_df in issues.items():
+        issues_file = os.path.join(
+            output_dir, f"{prefix}{table_name.lower().replace(' ', '_')}_issues.csv"
+        )
+        issues_df.to_csv(issues_file, index=False)
+        print(f"Saved validation issues to {issues_file}")
+    for table_name, df in results.items():
+        if isinstance(df, pd.DataFrame) and not df.empty:
+            print(f"\n{table_name} Data (first 5 rows):")
+            print(df.head())
+            print(f"Total rows: {len(df)}")
+            file_name = os.path.join(
+                output_dir, f"{prefix}{table_name.lower().replace(' ', '_')}_data.csv"
+            )
+            df.to_csv(file_name, index=False)
+            print(f"Saved to {file_name}")
+
+
+def record_snapshots(snapshot_db, writers):
+    """Add today's selenium tables to the snapshot history."""
+    store = SnapshotStore(snapshot_db)
+    try:
+        for table_name, writer in writers.items():
+            snapshot_id, new_rows = store.record_file(table_name, writer.path)
+            print(
+                f"Snapshot {snapshot_id} of {table_name}: "
+                f"{writer.rows_written} rows, {new_rows} new"
+            )
+    finally:
+        store.close()
+
+
+def main(use_requests=True, use_selenium=True, output_dir=".", parser="auto",
+         html_files=None, workers=None, snapshot_db=None):
     print("Starting scraping process...")
-    print("\nTrying with requests and BeautifulSoup first...")
-    data_from_requests = scrape_with_requests()
-    if data_from_requests:
-        for table_name, df in data_from_requests.items():
-            if isinstance(df, pd.DataFrame) and not df.empty:
-                print(f"\n{table_name} Data (first 5 rows):")
-                print(df.head())
-                print(f"Total rows: {len(df)}")
-                df.to_csv(f"{table_name.lower().replace(' ', '_')}_data.csv", index=False)
-                print(
-                    f"Saved to {table_name.lower().replace(' ', '_')}_data.csv"
+    if html_files:
+        print(f"\nParsing {len(html_files)} saved page(s)...")
+        for path, results in scrape_saved_pages(html_files, parser, workers).items():
+            stem = os.path.splitext(os.path.basename(path))[0]
+            save_results(results, output_dir, f"{stem}_")
+        use_requests = use_selenium = False
+    if use_requests:
+        print("\nTrying with requests first...")
+        data_from_requests = scrape_with_requests(parser)
+        if data_from_requests:
+            save_results(data_from_requests, output_dir)
+    if use_selenium:
+        print("\nTrying with Selenium for more complete data...")
+        data_from_selenium = scrape_with_selenium(output_dir)
+        for table_name, writer in data_from_selenium.items():
+            print(f"\n{table_name}: {writer.rows_written} rows saved to {writer.path}")
+            issues_df = writer.issues_frame()
+            report_issues(table_name, issues_df)
+            if not issues_df.empty:
+                issues_file = os.path.join(
+                    output_dir,
+                    f"{table_name.lower().replace(' ', '_')}_selenium_issues.csv",
                 )
-    print("\nTrying with Selenium for more complete data...")
-    data_from_selenium = scrape_with_selenium()
-    if data_from_selenium:
-        for table_name, df in data_from_selenium.items():
-            if isinstance(df, pd.DataFrame) and not df.empty:
-                print(f"\n{table_name} Data (first 5 rows):")
-                print(df.head())
-                print(f"Total rows: {len(df)}")
-                file_name = f"{table_name.lower().replace(' ', '_')}_selenium_data.csv"
-                df.to_csv(file_name, index=False)
-                print(f"Saved to {file_name}")
+                issues_df.to_csv(issues_file, index=False)
+                print(f"Saved validation issues to {issues_file}")
+        if snapshot_db:
+            record_snapshots(snapshot_db, data_from_selenium)
     print("\nScraping process completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Single entry point for the scraper, enrichment and analysis scripts.
+
+    python scraper/cli.py scrape [--no-requests] [--no-selenium] [--output-dir DIR]
+                                 [--parser lxml|bs4] [--html-files PAGE...]
+    python scraper/cli.py enrich [enrich-data.py options...]
+    python scraper/cli.py filter [--input FILE] [--output FILE]
+    python scraper/cli.py report [--input FILE] [--only NAME...] [--force]
+    python scraper/cli.py history {record,list,as-of,diff} ...
+    python scraper/cli.py entities {build,lookup} ...
+    python scraper/cli.py watch [--interval SECONDS] [--once] [--enrich]
+    python scraper/cli.py check-startup
+
+Only the standard library is imported at startup. pandas, Selenium,
+webdriver_manager and bs4 are loaded by the subcommand that needs them, so
+short jobs such as cron-driven delta runs start quickly.
+"""
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+
+SCRAPER_DIR = os.path.dirname(os.path.abspath(__file__))
+ANALYSIS_DIR = os.path.join(os.path.dirname(SCRAPER_DIR), "analysis")
+
+# Wall-clock budget for `cli.py --help`, which is what every subcommand pays
+# before it starts loading its own dependencies.
+IMPORT_BUDGET_SECONDS = 0.25
+
+# Modules that must never be imported just to start the CLI.
+HEAVY_MODULES = ["pandas", "numpy", "selenium", "webdriver_manager", "bs4", "requests"]
+
+
+def load_script(path, name):
+    """
+    Import a script by file path. The scripts have hyphenated names
+    (best-scraper.py, enrich-data.py) that a normal import can't reach.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if SCRAPER_DIR not in sys.path:
+        sys.path.insert(0, SCRAPER_DIR)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def cmd_scrape(args):
+    scraper = load_script(os.path.join(SCRAPER_DIR, "best-scraper.py"), "best_scraper")
+    scraper.main(
+        use_requests=not args.no_requests,
+        use_selenium=not args.no_selenium,
+        output_dir=args.output_dir,
+        parser=args.parser,
+        html_files=args.html_files,
+        workers=args.workers,
+        snapshot_db=args.snapshot_db,
+    )
+
+
+def cmd_enrich(args):
+    enrich = load_script(os.path.join(SCRAPER_DIR, "enrich-data.py"), "enrich_data")
+    enrich.main(args.enrich_args)
+
+
+def cmd_filter(args):
+    contract_filter = load_script(os.path.join(ANALYSIS_DIR, "filter.py"), "contract_filter")
+    contract_filter.filter_contracts(args.input, args.output)
+
+
+def cmd_report(args):
+    if ANALYSIS_DIR not in sys.path:
+        sys.path.insert(0, ANALYSIS_DIR)
+    import report
+
+    results = report.generate_reports(args.input, args.only, args.cache_dir, args.force)
+    for name, df in results.items():
+        print(f"\n{name} ({len(df)} rows)")
+        print(df.head(args.rows).to_string(index=False))
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            df.to_csv(os.path.join(args.output_dir, f"{name}.csv"), index=False)
+
+
+def cmd_history(args):
+    import pandas as pd
+    from snapshots import SnapshotStore
+
+    store = SnapshotStore(args.db)
+    try:
+        if args.action == "record":
+            snapshot_id, new_rows = store.record_file(args.section, args.file, args.taken_at)
+            print(f"Snapshot {snapshot_id} of {args.section}: {new_rows} new row(s)")
+        elif args.action == "list":
+            print(store.snapshots(args.section).to_string(index=False))
+            print(store.stats())
+        elif args.action == "as-of":
+            df = store.as_of(args.section, args.when)
+            df.to_csv(args.output or sys.stdout, index=False)
+        elif args.action == "diff":
+            added, removed = store.diff(args.section, args.start, args.end)
+            print(f"{len(added)} row(s) added, {len(removed)} row(s) removed")
+            if args.output:
+                changes = pd.concat(
+                    [added.assign(change="added"), removed.assign(change="removed")],
+                    ignore_index=True,
+                )
+                changes.to_csv(args.output, index=False)
+    finally:
+        store.close()
+
+
+def cmd_entities(args):
+    from entity_index import EntityIndex, build_index
+
+    if args.action == "build":
+        columns = {}
+        for item in args.column or []:
+            field, _, column = item.partition("=")
+            columns[field] = int(column) if column.isdigit() else column
+        started = time.perf_counter()
+        count = build_index(args.extract, args.index, columns, args.delimiter, args.header)
+        print(f"Indexed {count} entities into {args.index} in {time.perf_counter() - started:.1f}s")
+    else:
+        index = EntityIndex(args.index)
+        try:
+            for key in args.keys:
+                record = index.by_uei(key) if len(key) == 12 else index.by_cage(key)
+                print(f"{key}\t{record}")
+        finally:
+            index.close()
+
+
+def cmd_watch(args):
+    import shlex
+
+    import scheduler
+
+    def on_change(sections):
+        scraper = load_script(os.path.join(SCRAPER_DIR, "best-scraper.py"), "best_scraper")
+        writers = scraper.scrape_with_selenium(args.output_dir, sections=sections)
+        for table_name, writer in writers.items():
+            print(f"{table_name}: {writer.rows_written} rows saved to {writer.path}")
+            scraper.report_issues(table_name, writer.issues_frame())
+        if args.snapshot_db:
+            scraper.record_snapshots(args.snapshot_db, writers)
+        if args.enrich and "Contracts" in writers:
+            enrich = load_script(os.path.join(SCRAPER_DIR, "enrich-data.py"), "enrich_data")
+            try:
+                enrich.main(["--input", writers["Contracts"].path] + shlex.split(args.enrich_args))
+            except (Exception, SystemExit) as e:
+                # The sections are already written; a failed enrichment (or a bad
+                # --enrich-args, which argparse turns into SystemExit) must not
+                # mark them for re-extraction. The queue resumes on the next run.
+                print(f"[ERROR] Enrichment of {writers['Contracts'].path} failed: {e}")
+        # extract_table_with_selenium logs and skips a section that failed;
+        # leaving it out here keeps its old fingerprint so it is retried.
+        return [section for section in sections if section in writers]
+
+    scheduler.watch(
+        on_change,
+        state_file=args.state_file,
+        interval=args.interval,
+        parser=args.parser,
+        metrics_file=args.metrics_file,
+        max_polls=1 if args.once else None,
+    )
+
+
+def cmd_check_startup(args):
+    """
+    Start the CLI in a fresh interpreter with -X importtime and compare the
+    wall-clock time against IMPORT_BUDGET_SECONDS. Also fails if any heavy
+    module was imported at startup.
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--help"],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.rstrip()))
+
+    loaded = {name.strip().split(".")[0] for _, name in imports}
+    heavy = [module for module in HEAVY_MODULES if module in loaded]
+    top_level = sorted((item for item in imports if not item[1].startswith("  ")), reverse=True)
+
+    print(f"Startup: {elapsed:.3f}s (budget {IMPORT_BUDGET_SECONDS:.3f}s)")
+    for cumulative, name in top_level[: args.top]:
+        print(f"  {cumulative / 1e6:.3f}s {name.strip()}")
+    if heavy:
+        print(f"[ERROR] Heavy modules imported at startup: {', '.join(heavy)}")
+    if completed.returncode != 0 or heavy or elapsed > IMPORT_BUDGET_SECONDS:
+        sys.exit(1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="doge.gov savings scraper")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subparsers.add_parser("scrape", help="scrape the savings tables")
+    scrape.add_argument("--no-requests", action="store_true", help="skip the requests/bs4 pass")
+    scrape.add_argument("--no-selenium", action="store_true", help="skip the Selenium pass")
+    scrape.add_argument("--output-dir", default=".")
+    scrape.add_argument("--parser", choices=["auto", "lxml", "bs4"], default="auto",
+                        help="HTML parsing backend for the requests pass")
+    scrape.add_argument("--html-files", nargs="+",
+                        help="parse saved copies of the page instead of fetching it")
+    scrape.add_argument("--workers", type=int, help="processes used to parse saved pages")
+    scrape.add_argument("--snapshot-db", help="record the Selenium tables in this snapshot history")
+    scrape.set_defaults(func=cmd_scrape)
+
+    # --help is passed through to enrich-data.py's own parser.
+    enrich = subparsers.add_parser(
+        "enrich",
+        help="enrich contracts with FPDS vendor fields (options as in enrich-data.py)",
+        add_help=False,
+    )
+    enrich.add_argument("enrich_args", nargs=argparse.REMAINDER)
+    enrich.set_defaults(func=cmd_enrich)
+
+    filter_parser = subparsers.add_parser("filter", help="drop subscription/licence contracts")
+    filter_parser.add_argument("--input", default="contracts_selenium_data.csv")
+    filter_parser.add_argument("--output", default="contracts_filtered.csv")
+    filter_parser.set_defaults(func=cmd_filter)
+
+    report = subparsers.add_parser("report", help="cached analysis reports for an enriched contracts CSV")
+    report.add_argument("--input", default="contracts_with_extracted_fields.csv")
+    report.add_argument("--only", nargs="+", help="report names to build (default: all)")
+    report.add_argument("--cache-dir", default=".report_cache")
+    report.add_argument("--force", action="store_true", help="recompute even if cached")
+    report.add_argument("--output-dir", help="also write each report as CSV here")
+    report.add_argument("--rows", type=int, default=10, help="rows of each report to print")
+    report.set_defaults(func=cmd_report)
+
+    history = subparsers.add_parser("history", help="query the snapshot history of scraped tables")
+    history.add_argument("--db", default="snapshots.sqlite")
+    history_actions = history.add_subparsers(dest="action", required=True)
+    record = history_actions.add_parser("record", help="snapshot a scraped CSV")
+    record.add_argument("section", help="table name, e.g. Contracts")
+    record.add_argument("file")
+    record.add_argument("--taken-at", help="scrape time, defaults to now")
+    listing = history_actions.add_parser("list", help="list snapshots")
+    listing.add_argument("section", nargs="?")
+    as_of = history_actions.add_parser("as-of", help="state of a table as of a date")
+    as_of.add_argument("section")
+    as_of.add_argument("when")
+    as_of.add_argument("--output")
+    diff = history_actions.add_parser("diff", help="rows added/removed between two dates")
+    diff.add_argument("section")
+    diff.add_argument("start")
+    diff.add_argument("end")
+    diff.add_argument("--output")
+    history.set_defaults(func=cmd_history)
+
+    entities = subparsers.add_parser("entities", help="local index of a bulk SAM entity extract")
+    entities.add_argument("--index", default="entity_index", help="index directory")
+    entity_actions = entities.add_subparsers(dest="action", required=True)
+    build = entity_actions.add_parser("build", help="index a pipe-delimited entity extract")
+    build.add_argument("extract")
+    build.add_argument("--column", action="append", metavar="FIELD=COLUMN",
+                       help="override a field's column position (or name, with --header)")
+    build.add_argument("--delimiter", default="|")
+    build.add_argument("--header", action="store_true", help="the first line names the columns")
+    lookup = entity_actions.add_parser("lookup", help="look up UEIs or cage codes")
+    lookup.add_argument("keys", nargs="+")
+    entities.set_defaults(func=cmd_entities)
+
+    watch = subparsers.add_parser(
+        "watch", help="re-scrape only the sections whose data changed, polling the page cheaply"
+    )
+    watch.add_argument("--interval", type=float, default=3600, help="seconds between polls")
+    watch.add_argument("--once", action="store_true", help="poll a single time (for cron)")
+    watch.add_argument("--state-file", default="watch_state.json",
+                       help="fingerprints of the last successful run")
+    watch.add_argument("--metrics-file", default="watch_metrics.jsonl",
+                       help="append the time and bytes of every poll here")
+    watch.add_argument("--output-dir", default=".")
+    watch.add_argument("--parser", choices=["auto", "lxml", "bs4"], default="auto")
+    watch.add_argument("--snapshot-db", help="record re-scraped tables in this snapshot history")
+    watch.add_argument("--enrich", action="store_true", help="run enrichment when Contracts changed")
+    watch.add_argument("--enrich-args", default="",
+                       help='extra enrich-data.py options, e.g. "--feed --entity-index entity_index"')
+    watch.set_defaults(func=cmd_watch)
+
+    check = subparsers.add_parser("check-startup", help="measure CLI startup against its budget")
+    check.add_argument("--top", type=int, default=5, help="number of slowest imports to show")
+    check.set_defaults(func=cmd_check_startup)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "enrich":
+        # REMAINDER doesn't pick up a leading option such as --help.
+        args.enrich_args = extra + args.enrich_args
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
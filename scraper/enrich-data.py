@@ -1,12 +1,16 @@
+import argparse
+import os
+import socket
 import time
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+
+import task_queue
+import fpds_feed
+from entity_index import EntityIndex
+from fpds import contract_key, parse_link
+from metrics import RunMetrics
+from normalize import SCHEMAS, report_issues
+from writers import IncrementalWriter
 
 
 def get_field_value(driver, element_id, fallback_title=None):
@@ -16,6 +20,8 @@ def get_field_value(driver, element_id, fallback_title=None):
     whose title attribute contains fallback_title.
     Returns the element's value or None if not found.
     """
+    from selenium.webdriver.common.by import By
+
     try:
         element = driver.find_element(By.ID, element_id)
     except Exception as e:
@@ -32,20 +38,121 @@ def get_field_value(driver, element_id, fallback_title=None):
     return element.get_attribute("value")
 
 
-def scrape_contract_page(driver, url):
+# Resources the enrichment pages never need: every value we read is in the
+# server-rendered <input> elements, so images, styles, fonts and scripts are
+# blocked through DevTools before they are requested. Each extension is
+# also matched with a query string ("style.css?v=3"). A bare "*.js*" would
+# block the .jsp contract pages themselves, so the "?" is spelled out.
+# Extensionless resources can't be matched by URL; images among them are
+# still off through the imagesEnabled setting.
+BLOCKED_EXTENSIONS = [
+    "png", "jpg", "jpeg", "gif", "svg", "ico", "webp",
+    "css", "woff", "woff2", "ttf", "otf", "eot",
+    "js", "mjs", "map",
+]
+BLOCKED_URL_PATTERNS = [
+    pattern
+    for extension in BLOCKED_EXTENSIONS
+    for pattern in (f"*.{extension}", f"*.{extension}?*")
+]
+
+# Every input scrape_contract_page reads. The page counts as rendered once
+# all of them exist or the document is past parsing.
+TARGET_INPUT_IDS = [
+    "organizationType", "reasonForModification", "vendorName", "cageCode",
+    "principalNAICSCode", "vendorDoingAsBusinessName", "UEINumber", "NAICSCodeDescription",
+]
+
+PAGE_TRANSFER_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return [bytes, resources.length];
+"""
+
+
+# Set on the current document before navigating, so the wait can tell the
+# previous contract page from the one being loaded.
+PREVIOUS_PAGE_MARKER = "__previousContractPage"
+
+
+def mark_previous_page(driver):
+    try:
+        driver.execute_script(f"window.{PREVIOUS_PAGE_MARKER} = true;")
+    except Exception:
+        # Nothing loaded yet (first page of the session).
+        pass
+
+
+class PageNotLoaded(Exception):
+    """The contract page didn't finish loading; the task is retryable, not dead."""
+
+
+def wait_for_page(driver, lean):
+    """
+    Wait until the page can be read. The lean profile returns as soon as
+    every target input exists or the document is no longer "loading";
+    the full profile waits for the body and an extra half second.
+    Raises PageNotLoaded on a timeout.
+
+    With the "none" page load strategy driver.get returns before the new
+    document replaces the previous contract page, whose inputs would match
+    straight away. mark_previous_page tags the old document first, and the
+    lean wait only looks for inputs once that tag is gone.
+    """
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    def new_page_ready(d):
+        if d.execute_script(f"return window.{PREVIOUS_PAGE_MARKER} === true"):
+            return False
+        return (
+            all(d.find_elements(By.ID, element_id) for element_id in TARGET_INPUT_IDS)
+            or d.execute_script("return document.readyState") != "loading"
+        )
+
+    try:
+        if lean:
+            # Scripts can fail while the next document is committing; keep polling.
+            WebDriverWait(
+                driver, 10, poll_frequency=0.05, ignored_exceptions=[WebDriverException]
+            ).until(new_page_ready)
+        else:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+    except Exception as e:
+        raise PageNotLoaded(f"page did not load in time: {e}") from e
+    if not lean:
+        time.sleep(0.5)  # Additional delay if needed
+
+
+def record_page_metrics(driver, metrics, seconds):
+    """Record load time plus bytes and resource count from the Performance API."""
+    metrics.record("page_seconds", seconds)
+    try:
+        transferred, resources = driver.execute_script(PAGE_TRANSFER_JS)
+    except Exception as e:
+        print(f"[ERROR] Could not read page transfer size: {e}")
+        return
+    metrics.record("page_bytes", transferred)
+    metrics.record("page_resources", resources)
+
+
+def scrape_contract_page(driver, url, lean=False, metrics=None):
     """
     Opens the given URL and extracts the desired fields.
     Returns a dictionary with the field names and their values.
     """
+    mark_previous_page(driver)
+    started = time.perf_counter()
     driver.get(url)
-    # Wait for the page body to be present.
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-    except Exception as e:
-        print(f"Page did not load in time: {e}")
-    time.sleep(0.5)  # Additional delay if needed
+    wait_for_page(driver, lean)
+    if metrics is not None:
+        record_page_metrics(driver, metrics, time.perf_counter() - started)
 
     # Define the fields to extract.
     fields = [
@@ -69,65 +176,343 @@ def scrape_contract_page(driver, url):
     return result
 
 
-def main():
-    # Setup Chrome with headless options.
+ENRICHMENT_FIELDS = [
+    "Organization Type",
+    "Reason For Modification",
+    "Legal Business Name",
+    "cage Code",
+    "Principal NAICS Code",
+    "Doing Business As Name",
+    "Unique Entity Identifier",
+    "NAICS Code Description",
+]
+
+# Columns that belong to the contract action, not the vendor. The entity
+# extract can't supply them; they come from the feed, the page or the input.
+CONTRACT_FIELDS = ["Reason For Modification", "Principal NAICS Code", "NAICS Code Description"]
+
+# A page that loads without either of these inputs will never yield vendor data.
+REQUIRED_FIELDS = ["Legal Business Name", "Unique Entity Identifier"]
+
+
+def build_driver(lean=True, page_load_strategy="eager"):
+    """
+    Setup Chrome with headless options.
+    The lean profile (the default for enrichment) stops page loads at
+    DOMContentLoaded (or immediately with page_load_strategy="none"),
+    disables images and extensions, and blocks non-document resources
+    through DevTools network interception.
+    """
+    # Only workers that scrape pages need Selenium; --merge and
+    # --dead-letter runs never import it.
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from webdriver_manager.chrome import ChromeDriverManager
+
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     options.binary_location = "/usr/bin/google-chrome"  # Adjust this path if needed
+    if lean:
+        options.page_load_strategy = page_load_strategy
+        options.add_argument("--disable-extensions")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
 
     driver = webdriver.Chrome(
         service=Service(ChromeDriverManager().install()),
         options=options
     )
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
 
-    # Read the original CSV.
-    contracts_df = pd.read_csv("contracts_selenium_data.csv")
-    
-    if "LINK" not in contracts_df.columns:
-        print("CSV file does not contain a column named 'LINK'.")
-        driver.quit()
+
+def store_result(queue, key, url, fields):
+    """
+    Complete a task, or dead-letter it if the vendor inputs are missing.
+    Only call this for a page that finished loading; load failures go
+    through queue.fail so they can be retried.
+    """
+    missing = [name for name in REQUIRED_FIELDS if not fields.get(name)]
+    if len(missing) == len(REQUIRED_FIELDS):
+        print(f"[ERROR] Page {url} has no vendor inputs; moved to dead-letter list")
+        queue.dead_letter(key, f"missing inputs: {', '.join(missing)}", fields)
+    else:
+        queue.complete(key, fields)
+
+
+def fill_vendor_fields(fields, entity_index):
+    """Fill blank vendor columns in fields from the entity index, by UEI."""
+    extract = entity_index.enrichment_fields(fields.get("Unique Entity Identifier"))
+    if extract:
+        for name, value in extract.items():
+            if not fields.get(name):
+                fields[name] = value
+    return fields
+
+
+def fill_from_entity_index(queue, entity_index, known, worker_id, lease_seconds, claim_size=500):
+    """
+    Complete tasks whose UEI and contract-level columns are already in the
+    input (known maps contract key -> those input values, e.g. from an
+    earlier output), taking the vendor columns from the local entity index.
+    The extract has no contract-level data, so tasks are only completed here
+    when the input supplies it. Tasks whose UEI isn't in the extract are
+    handed back as pending. Returns the number of tasks completed.
+    """
+    completed = 0
+    unmatched = 0
+    keys = list(known)
+    for start in range(0, len(keys), claim_size):
+        batch = queue.claim_keys(keys[start:start + claim_size], worker_id, lease_seconds)
+        misses = []
+        for key, url in batch:
+            row = known[key]
+            vendor = entity_index.enrichment_fields(row["Unique Entity Identifier"])
+            if vendor:
+                fields = dict.fromkeys(ENRICHMENT_FIELDS)
+                fields.update({name: row.get(name) for name in CONTRACT_FIELDS})
+                fields.update(vendor)
+                store_result(queue, key, url, fields)
+                completed += 1
+            else:
+                misses.append(key)
+        queue.release(misses, worker_id)
+        unmatched += len(misses)
+    print(f"[INFO] Entity index filled {completed} task(s); {unmatched} UEI(s) not in the extract")
+    return completed
+
+
+def known_contract_fields(input_file, columns):
+    """
+    Contract key -> UEI and contract-level columns for input rows that carry
+    all of them (Reason For Modification may be blank, as on the page).
+    Returns {} when the input lacks those columns.
+    """
+    needed = ["Unique Entity Identifier", "Principal NAICS Code", "NAICS Code Description"]
+    if any(name not in columns for name in needed):
+        return {}
+    usecols = ["LINK"] + [name for name in ["Unique Entity Identifier"] + CONTRACT_FIELDS if name in columns]
+    known = {}
+    for chunk in pd.read_csv(input_file, dtype=str, usecols=usecols, chunksize=1000):
+        chunk = chunk.dropna(subset=["LINK"] + needed)
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.to_dict("records"):
+            known[contract_key(row.pop("LINK"))] = row
+    return known
+
+
+def ingest_from_feed(queue, worker_id, lease_seconds, feed_url, max_workers, claim_size=500,
+                     entity_index=None):
+    """
+    Fill pending tasks from the FPDS ATOM feed, which returns many contracts
+    per request. Tasks the feed doesn't know are handed back as pending for
+    the page scraper. With an entity_index, vendor columns the feed leaves
+    blank are looked up by the UEI it returns. Returns the number of tasks
+    completed from the feed.
+    """
+    completed = 0
+    unmatched = 0
+    # Walk a fixed list of keys and lease one batch at a time, so a slow feed
+    # never holds the whole queue and released misses aren't claimed again.
+    keys = queue.claimable_keys()
+    for start in range(0, len(keys), claim_size):
+        batch = queue.claim_keys(keys[start:start + claim_size], worker_id, lease_seconds)
+        if not batch:
+            continue
+        piids = [parse_link(url)["PIID"] for _, url in batch]
+        records = fpds_feed.ingest([p for p in piids if p], feed_url, max_workers)
+        misses = []
+        for key, url in batch:
+            if key in records:
+                fields = records[key]
+                if entity_index is not None:
+                    fill_vendor_fields(fields, entity_index)
+                store_result(queue, key, url, fields)
+                completed += 1
+            else:
+                misses.append(key)
+        queue.release(misses, worker_id)
+        unmatched += len(misses)
+    print(f"[INFO] Feed filled {completed} task(s); {unmatched} left for page scraping")
+    return completed
+
+
+def process_queue(driver, queue, worker_id, batch_size, lease_seconds, lean=True, metrics=None):
+    """
+    Lease batches of tasks from the queue and scrape them until nothing is
+    left to claim. Successes are stored as done, exceptions as failed (with
+    the error), and pages missing the vendor inputs go to the dead-letter
+    list. Several processes can run this against the same queue file.
+    """
+    processed = 0
+    while True:
+        batch = queue.claim_batch(worker_id, batch_size, lease_seconds)
+        if not batch:
+            break
+        print(f"[INFO] {worker_id} claimed {len(batch)} task(s)")
+        for position, (key, url) in enumerate(batch):
+            processed += 1
+            print(f"[INFO] Processing contract {processed}: {url}")
+            try:
+                fields = scrape_contract_page(driver, url, lean, metrics)
+            except Exception as err:
+                print(f"[ERROR] Processing link {url} failed: {err}")
+                queue.fail(key, str(err))
+                if metrics is not None:
+                    metrics.increment("pages_failed")
+                continue
+            store_result(queue, key, url, fields)
+            # Keep the rest of the batch from being re-issued to another worker.
+            remaining = [task_key for task_key, _ in batch[position + 1:]]
+            if remaining:
+                queue.extend_lease(remaining, worker_id, lease_seconds)
+    return processed
+
+
+def write_output(input_file, queue, output_file, chunk_size=1000):
+    """
+    Join the queue results back onto the contracts by contract key and save
+    them. The input is read and written in chunks, so only one chunk of rows
+    and its results are in memory at a time.
+    """
+    with IncrementalWriter(
+        output_file, schema=SCHEMAS["Contracts"] + SCHEMAS["Enrichment"]
+    ) as writer:
+        # Read everything as text; normalize_table parses the typed columns.
+        for chunk in pd.read_csv(input_file, dtype=str, chunksize=chunk_size):
+            keys = [contract_key(url) if isinstance(url, str) else None for url in chunk["LINK"]]
+            results = queue.results_for(key for key in keys if key is not None)
+            for col in ENRICHMENT_FIELDS:
+                chunk[col] = [(results.get(key) or {}).get(col) for key in keys]
+            writer.write_frame(chunk)
+
+    issues_df = writer.issues_frame()
+    report_issues("Enriched contracts", issues_df)
+    issues_file = f"{os.path.splitext(output_file)[0]}_issues.csv"
+    if not issues_df.empty:
+        issues_df.to_csv(issues_file, index=False)
+    elif os.path.exists(issues_file):
+        # Don't leave a report from an earlier run next to a clean output.
+        os.remove(issues_file)
+    print(f"[INFO] Extraction complete. {writer.rows_written} rows saved to '{output_file}'")
+
+
+def print_dead_letters(queue):
+    dead = queue.tasks(task_queue.DEAD)
+    print(f"[INFO] {len(dead)} page(s) in the dead-letter list")
+    for task in dead:
+        print(f"{task['url']}\t{task['last_error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enrich contracts with FPDS vendor fields")
+    parser.add_argument("--input", default="contracts_selenium_data.csv")
+    parser.add_argument("--output", default="contracts_with_extracted_fields.csv")
+    parser.add_argument("--queue", default="enrichment_queue.sqlite",
+                        help="SQLite file holding the task queue (may be on a shared volume)")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="only retry tasks that failed in earlier runs")
+    parser.add_argument("--dead-letter", action="store_true",
+                        help="list pages that permanently lack vendor inputs and exit")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="tasks that failed (or whose lease expired) this many times are not retried")
+    parser.add_argument("--worker", action="store_true",
+                        help="only process tasks from an existing queue, don't enqueue or write output")
+    parser.add_argument("--merge", action="store_true",
+                        help="only write the output CSV from the queue results")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--lease-seconds", type=float, default=300,
+                        help="tasks held longer than this by a silent worker are re-issued")
+    parser.add_argument("--full-page-load", action="store_true",
+                        help="load every page resource instead of the lean enrichment profile")
+    parser.add_argument("--page-load-strategy", choices=["eager", "none"], default="eager",
+                        help="page load strategy for the lean profile")
+    parser.add_argument("--metrics-file", default="enrichment_metrics.jsonl",
+                        help="append a summary of page load time and bytes per run here")
+    parser.add_argument("--feed", action="store_true",
+                        help="fill tasks from the FPDS ATOM feed first; only misses load pages")
+    parser.add_argument("--feed-url", default=fpds_feed.FEED_URL)
+    parser.add_argument("--feed-workers", type=int, default=4,
+                        help="feed requests in flight at once")
+    parser.add_argument("--entity-index",
+                        help="directory built by `cli.py entities build`; fills vendor columns "
+                             "by UEI for contracts resolved by --feed (or whose UEI and contract "
+                             "columns are in the input), so fewer pages are loaded")
+    args = parser.parse_args(argv)
+
+    queue = task_queue.TaskQueue(args.queue, max_attempts=args.max_attempts)
+    if args.dead_letter:
+        print_dead_letters(queue)
+        queue.close()
         return
 
-    # For every contract, scrape the page and add the extracted fields to the DataFrame.
-    extracted_data = {
-        "Organization Type": [],
-        "Reason For Modification": [],
-        "Legal Business Name": [],
-        "cage Code": [],
-        "Principal NAICS Code": [],
-        "Doing Business As Name": [],
-        "Unique Entity Identifier": [],
-        "NAICS Code Description": []
-    }
-    
-    total_contracts = len(contracts_df)
-    for idx, row in contracts_df.iterrows():
-        url = row["LINK"]
-        print(f"[INFO] Processing contract {idx+1}/{total_contracts}: {url}")
+    if not args.worker:
+        columns = pd.read_csv(args.input, nrows=0).columns
+        if "LINK" not in columns:
+            print("CSV file does not contain a column named 'LINK'.")
+            queue.close()
+            return
+
+    if args.retry_failed:
+        requeued = queue.retry_failed(max_attempts=args.max_attempts)
+        print(f"[INFO] Requeued {requeued} failed task(s)")
+    elif not args.worker and not args.merge:
+        for chunk in pd.read_csv(args.input, dtype=str, usecols=["LINK"], chunksize=1000):
+            links = chunk["LINK"].dropna()
+            queue.enqueue([(contract_key(url), url) for url in links])
+    print(f"[INFO] Queue state: {queue.counts()}")
+
+    entity_index = EntityIndex(args.entity_index) if args.entity_index else None
+    if entity_index is not None and not args.worker and not args.merge:
+        # An input that already carries UEIs and contract columns (e.g. an
+        # earlier output) only needs the vendor columns refreshed.
+        known = known_contract_fields(args.input, columns)
+        if known:
+            fill_from_entity_index(queue, entity_index, known, args.worker_id, args.lease_seconds)
+        elif not args.feed:
+            print(
+                "[WARN] --entity-index has nothing to join on: the input has no UEI and "
+                "contract columns, and --feed (which resolves them) is off. "
+                "Every contract will be loaded as a page."
+            )
+
+    if args.feed and not args.merge:
+        ingest_from_feed(
+            queue, args.worker_id, args.lease_seconds, args.feed_url, args.feed_workers,
+            entity_index=entity_index,
+        )
+    if entity_index is not None:
+        entity_index.close()
+
+    # Expired leases count too: a crashed worker leaves its tasks in flight.
+    if not args.merge and queue.has_claimable():
+        lean = not args.full_page_load
+        metrics = RunMetrics("enrichment-lean" if lean else "enrichment-full")
+        driver = build_driver(lean, args.page_load_strategy)
         try:
-            fields = scrape_contract_page(driver, url)
-            # Append the field values to the extracted_data dictionary.
-            for key in extracted_data.keys():
-                extracted_data[key].append(fields.get(key))
-        except Exception as err:
-            print(f"[ERROR] Processing link {url} failed: {err}")
-            # Append None if error occurs.
-            for key in extracted_data.keys():
-                extracted_data[key].append(None)
-
-    # Close the Selenium driver.
-    driver.quit()
-
-    # Add the new fields to the original DataFrame.
-    for col, values in extracted_data.items():
-        contracts_df[col] = values
-
-    # Save the updated DataFrame to CSV.
-    output_file = "contracts_with_extracted_fields.csv"
-    contracts_df.to_csv(output_file, index=False)
-    print(f"[INFO] Extraction complete. Data saved to '{output_file}'")
+            processed = process_queue(
+                driver, queue, args.worker_id, args.batch_size, args.lease_seconds,
+                lean, metrics,
+            )
+        finally:
+            # Close the Selenium driver.
+            driver.quit()
+        print(f"[INFO] {args.worker_id} processed {processed} task(s)")
+        metrics.print_summary()
+        metrics.append_to(args.metrics_file)
+        print(f"[INFO] Queue state: {queue.counts()}")
+
+    if not args.worker:
+        write_output(args.input, queue, args.output)
+    queue.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+import json
+import mmap
+import os
+
+import numpy as np
+
+# 0-based positions of the fields we need in the SAM.gov public entity
+# extract (pipe-delimited, V2 layout). Override with columns= if the layout
+# of the downloaded file differs, or give column names for files with a header.
+DEFAULT_COLUMNS = {
+    "uei": 0,
+    "cage": 3,
+    "legal_business_name": 11,
+    "dba_name": 12,
+    "entity_structure": 27,
+    "primary_naics": 32,
+}
+
+RECORD_FIELDS = ["uei", "cage", "legal_business_name", "dba_name", "entity_structure", "primary_naics"]
+
+# SAM entity structure codes mapped to the Organization Type wording FPDS uses.
+ENTITY_STRUCTURES = {
+    "2J": "SOLE PROPRIETORSHIP",
+    "2K": "PARTNERSHIP",
+    "2L": "CORPORATE NOT TAX EXEMPT",
+    "8H": "CORPORATE TAX EXEMPT",
+    "2A": "US GOVERNMENT ENTITY",
+    "CY": "FOREIGN GOVERNMENT",
+    "X6": "INTERNATIONAL ORG",
+    "ZZ": "OTHER",
+}
+
+# Fixed-width index entries: key, byte offset and length of the record.
+# Keys longer than the field can't be stored without truncating them into
+# another entity's key, so they are left out of that index and counted.
+KEY_DTYPES = {
+    "uei": np.dtype([("key", "S12"), ("offset", "<u8"), ("length", "<u4")]),
+    "cage": np.dtype([("key", "S5"), ("offset", "<u8"), ("length", "<u4")]),
+}
+
+# Index entries are packed into numpy arrays this many at a time while building.
+BUILD_CHUNK = 100000
+
+RECORDS_FILE = "records.dat"
+META_FILE = "meta.json"
+
+
+def _index_file(name):
+    return f"{name}.idx"
+
+
+def build_index(extract_path, index_dir, columns=None, delimiter="|", has_header=False):
+    """
+    Stream a bulk entity extract into an on-disk index in index_dir:
+    records.dat holds the needed fields of every entity, and uei.idx /
+    cage.idx hold sorted fixed-width (key, offset, length) entries. Only the
+    index entries are held in memory while building (about 24 bytes per
+    entity). Keys too long for their index field are skipped and counted in
+    meta.json. Returns the number of entities indexed.
+    """
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    os.makedirs(index_dir, exist_ok=True)
+    pending = {name: [] for name in KEY_DTYPES}
+    packed = {name: [] for name in KEY_DTYPES}
+    too_long = {name: 0 for name in KEY_DTYPES}
+    count = 0
+
+    def pack(name):
+        packed[name].append(np.array(pending[name], dtype=KEY_DTYPES[name]))
+        pending[name] = []
+
+    with open(extract_path, encoding="utf-8", errors="replace") as source, open(
+        os.path.join(index_dir, RECORDS_FILE), "wb"
+    ) as records:
+        positions = None
+        for line in source:
+            line = line.rstrip("\r\n")
+            if line.endswith("!end"):
+                line = line[: -len("!end")]
+            if positions is None:
+                if has_header:
+                    header = line.split(delimiter)
+                    positions = {
+                        field: header.index(column) if isinstance(column, str) else column
+                        for field, column in columns.items()
+                    }
+                    continue
+                positions = columns
+            # The SAM extract wraps its rows in BOF/EOF marker lines.
+            if not line or line.startswith(("BOF ", "EOF ")):
+                continue
+            values = line.split(delimiter)
+            record = [
+                values[positions[field]].strip() if positions[field] < len(values) else ""
+                for field in RECORD_FIELDS
+            ]
+            if not record[0] and not record[1]:
+                continue
+            encoded = ("|".join(record) + "\n").encode("utf-8")
+            offset = records.tell()
+            records.write(encoded)
+            for name, key in (("uei", record[0]), ("cage", record[1])):
+                if not key:
+                    continue
+                key = key.upper().encode("ascii", "replace")
+                if len(key) > KEY_DTYPES[name]["key"].itemsize:
+                    too_long[name] += 1
+                    continue
+                pending[name].append((key, offset, len(encoded)))
+                if len(pending[name]) >= BUILD_CHUNK:
+                    pack(name)
+            count += 1
+
+    for name in KEY_DTYPES:
+        pack(name)
+        table = np.concatenate(packed[name])
+        packed[name] = None
+        table.sort(order="key")
+        table.tofile(os.path.join(index_dir, _index_file(name)))
+        if too_long[name]:
+            print(
+                f"[WARN] {too_long[name]} {name} key(s) longer than "
+                f"{KEY_DTYPES[name]['key'].itemsize} characters were not indexed"
+            )
+
+    with open(os.path.join(index_dir, META_FILE), "w") as meta:
+        json.dump(
+            {
+                "source": os.path.abspath(extract_path),
+                "entities": count,
+                "fields": RECORD_FIELDS,
+                "skipped_keys": too_long,
+            },
+            meta,
+        )
+    return count
+
+
+class EntityIndex:
+    """
+    Read side of build_index. The records and both key indexes are
+    memory-mapped, and lookups are a binary search over the mapped keys, so
+    opening the index is instant and RAM use doesn't grow with the extract.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, META_FILE)) as meta:
+            self.meta = json.load(meta)
+        self._records_file = open(os.path.join(index_dir, RECORDS_FILE), "rb")
+        self._records = mmap.mmap(self._records_file.fileno(), 0, access=mmap.ACCESS_READ) if self.meta["entities"] else b""
+        self._keys = {}
+        for name, dtype in KEY_DTYPES.items():
+            path = os.path.join(index_dir, _index_file(name))
+            if os.path.getsize(path):
+                self._keys[name] = np.memmap(path, dtype=dtype, mode="r")
+            else:
+                self._keys[name] = np.zeros(0, dtype=dtype)
+
+    def close(self):
+        if isinstance(self._records, mmap.mmap):
+            self._records.close()
+        self._records_file.close()
+
+    def __len__(self):
+        return self.meta["entities"]
+
+    def _lookup(self, name, key):
+        if not key:
+            return None
+        table = self._keys[name]
+        key = key.strip().upper().encode("ascii", "replace")
+        if len(key) > table.dtype["key"].itemsize:
+            # numpy would truncate it and could match a different entity.
+            return None
+        needle = np.array(key, dtype=table.dtype["key"])
+        position = int(np.searchsorted(table["key"], needle))
+        if position >= len(table) or table["key"][position] != needle:
+            return None
+        offset, length = int(table["offset"][position]), int(table["length"][position])
+        values = self._records[offset:offset + length].decode("utf-8").rstrip("\n").split("|")
+        return dict(zip(RECORD_FIELDS, values))
+
+    def by_uei(self, uei):
+        return self._lookup("uei", uei)
+
+    def by_cage(self, cage):
+        return self._lookup("cage", cage)
+
+    def enrichment_fields(self, uei):
+        """
+        Vendor columns for a UEI in the enrichment layout, or None if the
+        entity isn't in the extract. Contract-level columns are not part of
+        the extract; in particular the entity's primary NAICS is not the
+        contract's Principal NAICS Code, so it is left out here.
+        """
+        record = self.by_uei(uei)
+        if record is None:
+            return None
+        return {
+            "Organization Type": ENTITY_STRUCTURES.get(record["entity_structure"], record["entity_structure"] or None),
+            "Legal Business Name": record["legal_business_name"] or None,
+            "cage Code": record["cage"] or None,
+            "Doing Business As Name": record["dba_name"] or None,
+            "Unique Entity Identifier": record["uei"],
+        }
@@ -0,0 +1,27 @@
+from urllib.parse import parse_qs, urlsplit
+
+
+# Query parameters of an FPDS ezsearch link that identify one contract action.
+KEY_PARAMS = ["agencyID", "PIID", "modNumber"]
+
+
+def parse_link(url):
+    """
+    Split an FPDS viewLinkController.jsp link into its query parameters.
+    Returns a dict with agencyID, PIID, modNumber, idvAgencyID, idvPIID and
+    contractType (missing parameters are empty strings).
+    """
+    query = parse_qs(urlsplit(url).query, keep_blank_values=True)
+    params = ["agencyID", "PIID", "modNumber", "idvAgencyID", "idvPIID", "contractType"]
+    return {name: query.get(name, [""])[0] for name in params}
+
+
+def contract_key(url):
+    """
+    Stable key for a contract action, used to merge results from several
+    workers. Falls back to the URL itself for links without a PIID.
+    """
+    parts = parse_link(url)
+    if not parts["PIID"]:
+        return url
+    return "|".join(parts[name] for name in KEY_PARAMS)
@@ -0,0 +1,145 @@
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+FEED_URL = "https://www.fpds.gov/ezsearch/FEEDS/ATOM"
+ATOM_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+
+# The feed returns at most this many entries per request; "start" pages on.
+PAGE_SIZE = 10
+
+# How many PIIDs go into one query. The feed ORs repeated criteria on the
+# same field, so one request covers a whole batch.
+PIIDS_PER_QUERY = 25
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find(element, *path):
+    """Follow a path of local tag names, ignoring the FPDS namespaces."""
+    for name in path:
+        if element is None:
+            return None
+        element = next((child for child in element if _local(child.tag) == name), None)
+    return element
+
+
+def _find_anywhere(element, name):
+    if element is None:
+        return None
+    return next((child for child in element.iter() if _local(child.tag) == name), None)
+
+
+def _text(element):
+    if element is None or element.text is None:
+        return None
+    return element.text.strip() or None
+
+
+def _described(element):
+    """Coded fields carry the readable value in a description attribute."""
+    if element is None:
+        return None
+    return element.get("description") or _text(element)
+
+
+def parse_entry(entry):
+    """
+    Map one feed entry (an award or IDV) onto the enrichment columns.
+    Returns (contract_key, fields) or None for entries without an ID.
+    """
+    document = _find(entry, "content")
+    document = next(iter(document), None) if document is not None else None
+    if document is None:
+        return None
+    contract_id = _find_anywhere(document, "awardContractID")
+    if contract_id is None:
+        contract_id = _find_anywhere(document, "IDVID")
+    if contract_id is None:
+        return None
+    key = "|".join(
+        _text(_find(contract_id, name)) or "" for name in ("agencyID", "PIID", "modNumber")
+    )
+
+    vendor = _find_anywhere(document, "vendor")
+    naics = _find_anywhere(document, "principalNAICSCode")
+    fields = {
+        "Organization Type": _text(_find_anywhere(vendor, "organizationalType")),
+        "Reason For Modification": _described(_find_anywhere(document, "reasonForModification")),
+        "Legal Business Name": _text(_find(vendor, "vendorHeader", "vendorName")),
+        "cage Code": _text(_find_anywhere(vendor, "cageCode")),
+        "Principal NAICS Code": _text(naics),
+        "Doing Business As Name": _text(_find(vendor, "vendorHeader", "vendorDoingAsBusinessName")),
+        "Unique Entity Identifier": _text(_find_anywhere(vendor, "UEI")),
+        "NAICS Code Description": naics.get("description") if naics is not None else None,
+    }
+    return key, fields
+
+
+def build_query(piids, agency_id=None):
+    query = " ".join(f'PIID:"{piid}"' for piid in piids)
+    if agency_id:
+        query += f' CONTRACTING_AGENCY_ID:"{agency_id}"'
+    return query
+
+
+def fetch_query(session, query, feed_url=FEED_URL, timeout=60):
+    """
+    Page through the feed for one query, parsing each response as it
+    streams in. Yields (contract_key, fields) per entry.
+    """
+    start = 0
+    while True:
+        response = session.get(
+            feed_url,
+            params={"FEEDNAME": "PUBLIC", "q": query, "start": start},
+            stream=True,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        response.raw.decode_content = True
+        entries = 0
+        try:
+            for _, element in ET.iterparse(response.raw, events=("end",)):
+                if element.tag != ATOM_ENTRY:
+                    continue
+                entries += 1
+                parsed = parse_entry(element)
+                # Entries are independent; free each one once it is mapped.
+                element.clear()
+                if parsed is not None:
+                    yield parsed
+        finally:
+            response.close()
+        if entries < PAGE_SIZE:
+            return
+        start += PAGE_SIZE
+
+
+def ingest(piids, feed_url=FEED_URL, max_workers=4, batch_size=PIIDS_PER_QUERY, agency_id=None):
+    """
+    Look up many PIIDs through the ATOM feed with at most max_workers
+    requests in flight. Returns a dict of contract_key -> enrichment fields
+    (the same eight columns scrape_contract_page produces).
+    """
+    import requests
+
+    piids = sorted(set(piids))
+    batches = [piids[i:i + batch_size] for i in range(0, len(piids), batch_size)]
+
+    def run(batch):
+        try:
+            with requests.Session() as session:
+                return list(fetch_query(session, build_query(batch, agency_id), feed_url))
+        except (requests.exceptions.RequestException, ET.ParseError) as e:
+            # Contracts from a failed batch fall back to page scraping.
+            print(f"[ERROR] Feed query for {len(batch)} PIID(s) failed: {e}")
+            return []
+
+    records = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch, found in zip(batches, pool.map(run, batches)):
+            print(f"[INFO] Feed query for {len(batch)} PIID(s) returned {len(found)} record(s)")
+            records.update(found)
+    return records
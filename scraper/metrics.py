@@ -0,0 +1,59 @@
+import json
+import os
+import time
+
+
+class RunMetrics:
+    """
+    Small accumulator for per-run numbers (page load time, bytes, polls...).
+    Each metric keeps count, total, min and max so a run can be summarised
+    without storing every sample.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.values = {}
+
+    def record(self, metric, value):
+        if value is None:
+            return
+        stats = self.values.setdefault(
+            metric, {"count": 0, "total": 0.0, "min": value, "max": value}
+        )
+        stats["count"] += 1
+        stats["total"] += value
+        stats["min"] = min(stats["min"], value)
+        stats["max"] = max(stats["max"], value)
+
+    def increment(self, metric, amount=1):
+        self.record(metric, amount)
+
+    def summary(self):
+        """Return a dict of metric -> stats including the mean"""
+        summary = {}
+        for metric, stats in self.values.items():
+            summary[metric] = dict(stats, mean=stats["total"] / stats["count"])
+        return summary
+
+    def print_summary(self):
+        print(f"[INFO] {self.name} metrics after {time.time() - self.started:.1f}s:")
+        for metric, stats in self.summary().items():
+            print(
+                f"[INFO]   {metric}: n={stats['count']} total={stats['total']:,.2f} "
+                f"mean={stats['mean']:,.2f} min={stats['min']:,.2f} max={stats['max']:,.2f}"
+            )
+
+    def append_to(self, path):
+        """Append this run's summary as one JSON line, so runs can be compared over time."""
+        record = {
+            "name": self.name,
+            "started": self.started,
+            "seconds": time.time() - self.started,
+            "metrics": self.summary(),
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(record) + "\n")
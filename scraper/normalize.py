@@ -0,0 +1,189 @@
+import pandas as pd
+
+
+# Multipliers for the short suffixes doge.gov uses on large amounts ("$1.2M").
+CURRENCY_SUFFIXES = {"": 1, "K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+
+CURRENCY_PATTERN = r"^(?P<sign>-)?\$?\s*(?P<number>[0-9][0-9,]*(?:\.[0-9]+)?)\s*(?P<suffix>[KMB]?)$"
+NAICS_PATTERN = r"^[0-9]{2,6}$"
+
+# Column schemas for every table we write. "type" selects the parser applied
+# to the whole column; "required" rows with an empty value are reported.
+SCHEMAS = {
+    "Contracts": [
+        {"name": "AGENCY", "type": "text", "required": True},
+        {"name": "DESCRIPTION", "type": "text", "required": False},
+        {"name": "UPLOADED ON", "type": "date", "required": True},
+        {"name": "LINK", "type": "text", "required": True},
+        {"name": "VALUE", "type": "currency", "required": True},
+    ],
+    "Grants": [
+        {"name": "AGENCY", "type": "text", "required": True},
+        {"name": "UPLOADED ON", "type": "date", "required": True},
+        {"name": "VALUE", "type": "currency", "required": True},
+    ],
+    "Real Estate": [
+        {"name": "MAIN AGENCY", "type": "text", "required": True},
+        {"name": "LOCATION", "type": "text", "required": False},
+        {"name": "SQ FT", "type": "number", "required": False},
+        {"name": "ANNUAL LEASE", "type": "currency", "required": True},
+    ],
+    "Embedded_Data": [
+        {"name": "date", "type": "date", "required": False},
+        {"name": "piid", "type": "text", "required": False},
+        {"name": "agency", "type": "text", "required": True},
+        {"name": "ceiling_value", "type": "currency", "required": False},
+        {"name": "value", "type": "currency", "required": True},
+        {"name": "update_date", "type": "date", "required": False},
+        {"name": "fpds_status", "type": "text", "required": False},
+        {"name": "fpds_link", "type": "text", "required": False},
+        {"name": "vendor", "type": "text", "required": False},
+        {"name": "description", "type": "text", "required": False},
+    ],
+    "Enrichment": [
+        {"name": "Organization Type", "type": "text", "required": False},
+        {"name": "Reason For Modification", "type": "text", "required": False},
+        {"name": "Legal Business Name", "type": "text", "required": False},
+        {"name": "cage Code", "type": "text", "required": False},
+        {"name": "Principal NAICS Code", "type": "naics", "required": False},
+        {"name": "Doing Business As Name", "type": "text", "required": False},
+        {"name": "Unique Entity Identifier", "type": "text", "required": False},
+        {"name": "NAICS Code Description", "type": "text", "required": False},
+    ],
+}
+
+ISSUE_COLUMNS = ["row", "column", "value", "problem"]
+
+
+def clean_text(series):
+    """Strip surrounding whitespace and turn empty strings into missing values"""
+    cleaned = series.astype("string").str.strip()
+    return cleaned.mask(cleaned == "")
+
+
+def parse_currency(series):
+    """
+    Parse a column of amounts such as "$1,234", "$ 12.50" or "$1.2M".
+    Returns the parsed column; cells that could not be parsed are missing.
+    Whole-dollar columns come back as Int64 so they round-trip through CSV
+    without a trailing ".0".
+    """
+    text = clean_text(series).str.upper()
+    parts = text.str.extract(CURRENCY_PATTERN)
+    number = pd.to_numeric(parts["number"].str.replace(",", "", regex=False), errors="coerce")
+    multiplier = parts["suffix"].map(CURRENCY_SUFFIXES).astype("float64")
+    values = (number * multiplier).round(2)
+    negative = parts["sign"].eq("-").fillna(False).astype(bool)
+    values = values.mask(negative, -values)
+    present = values.dropna()
+    if (present % 1 == 0).all():
+        return values.astype("Int64")
+    return values.astype("Float64")
+
+
+def parse_number(series):
+    """Parse plain numbers that may carry thousands separators ("3,076")"""
+    text = clean_text(series).str.replace(",", "", regex=False)
+    values = pd.to_numeric(text, errors="coerce")
+    present = values.dropna()
+    if (present % 1 == 0).all():
+        return values.astype("Int64")
+    return values.astype("Float64")
+
+
+def parse_date(series):
+    """Parse month/day/year and ISO dates into datetime64 values"""
+    text = clean_text(series)
+    return pd.to_datetime(text, errors="coerce", format="mixed")
+
+
+def parse_naics(series):
+    """
+    Keep NAICS codes as strings. Float artifacts from earlier CSV round trips
+    ("541519.0") are removed so codes compare and group correctly.
+    """
+    text = clean_text(series).str.replace(r"\.0+$", "", regex=True)
+    return text.where(text.str.fullmatch(NAICS_PATTERN).fillna(False).astype(bool))
+
+
+PARSERS = {
+    "text": clean_text,
+    "currency": parse_currency,
+    "number": parse_number,
+    "date": parse_date,
+    "naics": parse_naics,
+}
+
+
+def _issues_for(df, mask, column, problem):
+    """Build issue records for every row selected by mask"""
+    rows = df.index[mask.to_numpy()]
+    return pd.DataFrame(
+        {
+            "row": rows,
+            "column": column,
+            "value": df.loc[rows, column].astype("string") if column in df.columns else pd.NA,
+            "problem": problem,
+        },
+        columns=ISSUE_COLUMNS,
+    )
+
+
+def normalize_table(df, schema):
+    """
+    Normalize a whole scraped table column by column and validate it against
+    the given schema (a list from SCHEMAS). Rows are never dropped: values
+    that fail to parse become missing and are listed in the returned issues
+    DataFrame together with the original cell text.
+    Returns (normalized_df, issues_df).
+    """
+    if isinstance(schema, str):
+        schema = SCHEMAS[schema]
+    normalized = df.copy()
+    issues = []
+
+    for field in schema:
+        name = field["name"]
+        if name not in df.columns:
+            if field.get("required"):
+                issues.append(
+                    pd.DataFrame(
+                        [{"row": None, "column": name, "value": None, "problem": "missing column"}],
+                        columns=ISSUE_COLUMNS,
+                    )
+                )
+            continue
+
+        raw = clean_text(df[name])
+        parsed = PARSERS[field["type"]](df[name])
+        normalized[name] = parsed
+
+        unparsed = raw.notna() & parsed.isna()
+        if unparsed.any():
+            issues.append(_issues_for(df, unparsed, name, f"invalid {field['type']}"))
+        if field.get("required"):
+            empty = raw.isna()
+            if empty.any():
+                issues.append(_issues_for(df, empty, name, "missing value"))
+
+    # Any column the schema doesn't know about still gets its whitespace stripped.
+    known = {field["name"] for field in schema}
+    for name in df.columns:
+        if name not in known and df[name].dtype == object:
+            normalized[name] = clean_text(df[name])
+
+    if issues:
+        issues_df = pd.concat(issues, ignore_index=True)
+    else:
+        issues_df = pd.DataFrame(columns=ISSUE_COLUMNS)
+    return normalized, issues_df
+
+
+def report_issues(table_name, issues_df):
+    """Print a one-line summary per problem type instead of one line per row"""
+    if issues_df.empty:
+        return
+    print(f"[WARN] {table_name}: {len(issues_df)} value(s) failed validation")
+    summary = issues_df.groupby(["column", "problem"], dropna=False).size()
+    for (column, problem), count in summary.items():
+        print(f"[WARN]   {column}: {problem} x{count}")
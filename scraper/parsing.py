@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Sections of the savings page that hold a table, in page order.
+SECTIONS = ["Contracts", "Grants", "Real Estate"]
+
+
+def _cell_value_bs4(td):
+    if td.get("title"):
+        return td.get("title")
+    link = td.find("a")
+    if link and link.get("href"):
+        return link["href"]
+    # Amounts are kept as text and parsed column-wise by normalize_table.
+    return td.text.strip()
+
+
+def parse_tables_bs4(html, sections=SECTIONS):
+    """Reference backend: full BeautifulSoup tree with the stdlib html.parser."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    tables = {}
+    for table_section in sections:
+        section = soup.find("h2", string=lambda t: t and table_section in t)
+        if not section:
+            continue
+        table = section.find_next("table")
+        if not table:
+            continue
+        headers_list = [th.text.strip() for th in table.find_all("th")]
+        rows = []
+        for tr in table.find_all("tr")[1:]:
+            row = {}
+            for i, td in enumerate(tr.find_all("td")):
+                if i < len(headers_list):
+                    row[headers_list[i]] = _cell_value_bs4(td)
+            if row:
+                rows.append(row)
+        tables[table_section] = rows
+    return tables
+
+
+def _single_string(element):
+    """
+    lxml equivalent of BeautifulSoup's Tag.string: the text of an element
+    whose only content is one string, looking through single-child wrappers.
+    """
+    while True:
+        if len(element) == 0:
+            return element.text
+        if len(element) > 1 or element.text or element[0].tail:
+            return None
+        element = element[0]
+
+
+def _find_heading(headings, table_section):
+    for h2 in headings:
+        text = _single_string(h2)
+        if text and table_section in text:
+            return h2
+    return None
+
+
+# Text bs4's .text leaves out; lxml's text_content() would include it.
+_HIDDEN_TAGS = {"script", "style", "template"}
+
+
+def _visible_text(element):
+    """lxml equivalent of bs4's .text: all text except script/style and comments."""
+    parts = []
+    if isinstance(element.tag, str) and element.tag not in _HIDDEN_TAGS:
+        parts.append(element.text or "")
+        for child in element:
+            parts.append(_visible_text(child))
+            parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _cell_value_lxml(td):
+    if td.get("title"):
+        return td.get("title")
+    links = td.xpath(".//a[1]")
+    if links and links[0].get("href"):
+        return links[0].get("href")
+    return _visible_text(td).strip()
+
+
+def parse_tables_lxml(html, sections=SECTIONS):
+    """
+    Fast backend: libxml2's HTML parser plus targeted XPath lookups for the
+    section headings and the table after each one. Produces the same rows as
+    parse_tables_bs4.
+    """
+    import lxml.html
+
+    document = lxml.html.fromstring(html)
+    headings = document.xpath("//h2")
+    tables = {}
+    for table_section in sections:
+        section = _find_heading(headings, table_section)
+        if section is None:
+            continue
+        following = section.xpath("following::table[1]")
+        if not following:
+            continue
+        table = following[0]
+        headers_list = [_visible_text(th).strip() for th in table.iter("th")]
+        rows = []
+        for tr in list(table.iter("tr"))[1:]:
+            row = {}
+            for i, td in enumerate(tr.iter("td")):
+                if i < len(headers_list):
+                    row[headers_list[i]] = _cell_value_lxml(td)
+            if row:
+                rows.append(row)
+        tables[table_section] = rows
+    return tables
+
+
+BACKENDS = {
+    "bs4": parse_tables_bs4,
+    "lxml": parse_tables_lxml,
+}
+
+
+def resolve_backend(backend="auto"):
+    """Pick lxml when it is installed, otherwise fall back to bs4."""
+    if backend != "auto":
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown parsing backend: {backend}")
+        return backend
+    try:
+        import lxml.html  # noqa: F401
+    except ImportError:
+        return "bs4"
+    return "lxml"
+
+
+def parse_tables(html, backend="auto", sections=SECTIONS):
+    """
+    Extract the section tables from a savings page.
+    Returns a dict of section name -> list of row dicts.
+    """
+    return BACKENDS[resolve_backend(backend)](html, sections)
+
+
+def parse_file(path, backend="auto", sections=SECTIONS):
+    with open(path, encoding="utf-8") as handle:
+        return parse_tables(handle.read(), backend, sections)
+
+
+def parse_pages(paths, backend="auto", workers=None, sections=SECTIONS):
+    """
+    Parse several stored pages across a process pool.
+    Returns a list of (path, tables) in the order of paths.
+    """
+    backend = resolve_backend(backend)
+    workers = workers or min(len(paths), os.cpu_count() or 1) or 1
+    if workers == 1:
+        return [(path, parse_file(path, backend, sections)) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            parse_file, paths, [backend] * len(paths), [sections] * len(paths)
+        )
+        return list(zip(paths, results))
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from metrics import RunMetrics
+from parsing import SECTIONS, parse_tables
+
+SAVINGS_URL = "https://doge.gov/savings"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Contract records in the page's embedded Next.js payload. Only these objects
+# are hashed, so build ids and other volatile parts of the payload don't
+# register as changes.
+PAYLOAD_RECORD = re.compile(r'\{[^{}]*\\?"fpds_link\\?"[^{}]*\}')
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _newest_upload(rows):
+    dates = []
+    for row in rows:
+        try:
+            dates.append(datetime.strptime(row.get("UPLOADED ON", ""), "%m/%d/%Y"))
+        except ValueError:
+            continue
+    return max(dates).date().isoformat() if dates else None
+
+
+def fingerprint_page(html, parser="auto"):
+    """
+    Cheap per-section fingerprint of the savings page: the rows rendered
+    into the page, their newest UPLOADED ON date and, for Contracts, a hash
+    of the contract records in the embedded payload. Sections missing from
+    the page are left out.
+    """
+    fingerprints = {}
+    for section, rows in parse_tables(html, parser).items():
+        fingerprints[section] = {
+            "rows": len(rows),
+            "newest_upload": _newest_upload(rows),
+            "hash": _digest(rows),
+        }
+    if "Contracts" in fingerprints:
+        fingerprints["Contracts"]["payload"] = _digest(sorted(PAYLOAD_RECORD.findall(html)))
+    return fingerprints
+
+
+def changed_sections(previous, current):
+    """Sections whose fingerprint differs from the last successful run (all of them on the first)."""
+    return [section for section in SECTIONS if section in current and previous.get(section) != current[section]]
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {"validators": {}, "fingerprints": {}}
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_state(path, state):
+    # Write then rename, so a crash mid-write never leaves a truncated state file.
+    partial = f"{path}.partial"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2)
+    os.replace(partial, path)
+
+
+def fetch_page(session, validators, url=SAVINGS_URL, timeout=60):
+    """
+    Conditional GET of the savings page. Returns (html, validators, bytes);
+    html is None when the server answers 304 Not Modified.
+    """
+    headers = dict(HEADERS)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, validators, 0
+    response.raise_for_status()
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+    return response.text, validators, len(response.content)
+
+
+def poll_once(session, state, parser="auto", url=SAVINGS_URL):
+    """
+    One polling round. Returns (changed_sections, fingerprints, validators,
+    metrics); changed_sections is empty when nothing needs re-scraping.
+    """
+    metrics = RunMetrics("watch-poll")
+    started = time.perf_counter()
+    html, validators, size = fetch_page(session, state.get("validators", {}), url)
+    metrics.record("poll_bytes", size)
+    if html is None:
+        metrics.increment("not_modified")
+        metrics.record("poll_seconds", time.perf_counter() - started)
+        return [], state.get("fingerprints", {}), validators, metrics
+
+    fingerprints = fingerprint_page(html, parser)
+    metrics.record("poll_seconds", time.perf_counter() - started)
+    missing = [section for section in SECTIONS if section not in fingerprints]
+    if missing:
+        print(f"[WARN] Sections not found on the page: {', '.join(missing)}")
+    changed = changed_sections(state.get("fingerprints", {}), fingerprints)
+    metrics.record("changed_sections", len(changed))
+    return changed, fingerprints, validators, metrics
+
+
+def watch(on_change, state_file="watch_state.json", interval=3600, parser="auto",
+          metrics_file="watch_metrics.jsonl", url=SAVINGS_URL, max_polls=None):
+    """
+    Poll the savings page every interval seconds and call
+    on_change(sections) only for the sections whose fingerprint changed.
+    on_change returns the sections it actually extracted (None meaning all
+    of them). Only those get their new fingerprint saved, and the page's
+    ETag only once every changed section succeeded, so a failed extraction
+    is retried on the next poll. A poll that fails for any reason is logged,
+    counted as poll_errors and the loop carries on. The cost of each poll,
+    failed or not (and of each triggered run), is appended to metrics_file.
+    """
+    import requests
+
+    state = load_state(state_file)
+    polls = 0
+    with requests.Session() as session:
+        while True:
+            polls += 1
+            poll_started = time.perf_counter()
+            try:
+                changed, fingerprints, validators, metrics = poll_once(session, state, parser, url)
+            except Exception as e:
+                # Network errors, odd bodies the parser rejects, ...: skip this poll.
+                print(f"[ERROR] Polling {url} failed: {e}")
+                changed, validators = [], None
+                metrics = RunMetrics("watch-poll")
+                metrics.record("poll_seconds", time.perf_counter() - poll_started)
+                metrics.increment("poll_errors")
+            if changed:
+                print(f"[INFO] Changed since last run: {', '.join(changed)}")
+                started = time.perf_counter()
+                try:
+                    extracted = on_change(changed)
+                except Exception as e:
+                    print(f"[ERROR] Extraction for {', '.join(changed)} failed: {e}")
+                    extracted = []
+                if extracted is None:
+                    extracted = changed
+                failed = [section for section in changed if section not in extracted]
+                for section in changed:
+                    if section not in failed:
+                        state["fingerprints"][section] = fingerprints[section]
+                if failed:
+                    print(f"[ERROR] Not extracted, will retry next poll: {', '.join(failed)}")
+                    metrics.increment("failed_runs")
+                    validators = None
+                metrics.record("run_seconds", time.perf_counter() - started)
+            elif validators is not None:
+                print("[INFO] No changes")
+            if validators is not None:
+                state["validators"] = validators
+            metrics.append_to(metrics_file)
+            save_state(state_file, state)
+
+            if max_polls is not None and polls >= max_polls:
+                return
+            time.sleep(interval)
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import sqlite3
+import zlib
+from array import array
+from datetime import datetime
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    source TEXT,
+    row_count INTEGER NOT NULL,
+    members BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_section ON snapshots (section, taken_at);
+"""
+
+
+def _row_values(df):
+    """Rows as lists of plain JSON values (missing -> None, everything else as text)."""
+    values = df.astype(object).where(df.notna(), None)
+    return [[None if v is None else str(v) for v in row] for row in values.itertuples(index=False)]
+
+
+def _row_hash(columns, values):
+    payload = json.dumps([columns, values], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest(), payload
+
+
+class SnapshotStore:
+    """
+    History of scraped tables in one SQLite file.
+
+    Every distinct row is stored once, zlib-compressed and keyed by a
+    content hash of its column names and values. A snapshot is just the
+    ordered list of row ids it contains (itself packed and compressed), so a
+    daily scrape where most rows are unchanged only adds the new rows and a
+    small membership blob.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, section, df, taken_at=None, source=None):
+        """
+        Store df as a snapshot of section. Returns (snapshot_id, new_rows).
+        taken_at defaults to now; pass the scrape time when backfilling.
+        """
+        taken_at = pd.Timestamp(taken_at or datetime.now()).isoformat()
+        columns = [str(c) for c in df.columns]
+        hashes = []
+        payloads = {}
+        for values in _row_values(df):
+            row_hash, payload = _row_hash(columns, values)
+            hashes.append(row_hash)
+            payloads[row_hash] = payload
+
+        with self.conn:
+            known = self._ids_for(payloads.keys())
+            new_rows = [h for h in payloads if h not in known]
+            self.conn.executemany(
+                "INSERT INTO rows (hash, data) VALUES (?, ?)",
+                [(h, zlib.compress(payloads[h].encode("utf-8"), 9)) for h in new_rows],
+            )
+            ids = self._ids_for(payloads.keys())
+            members = array("q", (ids[h] for h in hashes))
+            cursor = self.conn.execute(
+                "INSERT INTO snapshots (section, taken_at, columns, source, row_count, members)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    section,
+                    taken_at,
+                    json.dumps(columns),
+                    source,
+                    len(hashes),
+                    zlib.compress(members.tobytes(), 9),
+                ),
+            )
+        return cursor.lastrowid, len(new_rows)
+
+    def record_file(self, section, path, taken_at=None):
+        """Snapshot a CSV as written by the scrapers (read as text so hashes are stable)."""
+        return self.record(section, pd.read_csv(path, dtype=str), taken_at, source=path)
+
+    def _ids_for(self, hashes):
+        hashes = list(hashes)
+        found = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row_id, row_hash in self.conn.execute(
+                f"SELECT id, hash FROM rows WHERE hash IN ({placeholders})", chunk
+            ):
+                found[row_hash] = row_id
+        return found
+
+    def snapshots(self, section=None):
+        """List snapshots as a DataFrame (id, section, taken_at, source, row_count)."""
+        query = "SELECT id, section, taken_at, source, row_count FROM snapshots"
+        params = ()
+        if section is not None:
+            query += " WHERE section = ?"
+            params = (section,)
+        query += " ORDER BY taken_at, id"
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def snapshot_as_of(self, section, when):
+        """Id of the latest snapshot of section taken at or before when, or None."""
+        when = pd.Timestamp(when)
+        if when.hour == when.minute == when.second == 0 and when.microsecond == 0:
+            # A bare date means "as of the end of that day".
+            when = when + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+        row = self.conn.execute(
+            "SELECT id FROM snapshots WHERE section = ? AND taken_at <= ?"
+            " ORDER BY taken_at DESC, id DESC LIMIT 1",
+            (section, when.isoformat()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def _member_ids(self, snapshot_id):
+        columns, members = self.conn.execute(
+            "SELECT columns, members FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone()
+        ids = array("q")
+        ids.frombytes(zlib.decompress(members))
+        return json.loads(columns), list(ids)
+
+    def _load_rows(self, ids):
+        unique = list(set(ids))
+        rows = {}
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for row_id, data in self.conn.execute(
+                f"SELECT id, data FROM rows WHERE id IN ({placeholders})", chunk
+            ):
+                rows[row_id] = json.loads(zlib.decompress(data))[1]
+        return rows
+
+    def load(self, snapshot_id):
+        """Rebuild a snapshot as a DataFrame of text values."""
+        columns, ids = self._member_ids(snapshot_id)
+        rows = self._load_rows(ids)
+        return pd.DataFrame([rows[i] for i in ids], columns=columns, dtype="string")
+
+    def as_of(self, section, when):
+        """State of section as of when (the latest snapshot at or before it)."""
+        snapshot_id = self.snapshot_as_of(section, when)
+        if snapshot_id is None:
+            raise ValueError(f"No snapshot of {section} on or before {when}")
+        return self.load(snapshot_id)
+
+    def diff(self, section, start, end):
+        """
+        Rows added and removed between the state as of start and as of end.
+        Returns (added_df, removed_df). Only row ids are compared, so nothing
+        is decompressed except the rows that actually changed.
+        """
+        start_id = self.snapshot_as_of(section, start)
+        end_id = self.snapshot_as_of(section, end)
+        if end_id is None:
+            raise ValueError(f"No snapshot of {section} on or before {end}")
+        end_columns, end_ids = self._member_ids(end_id)
+        if start_id is None:
+            start_columns, start_ids = end_columns, []
+        else:
+            start_columns, start_ids = self._member_ids(start_id)
+
+        end_set, start_set = set(end_ids), set(start_ids)
+        added = [i for i in end_ids if i not in start_set]
+        removed = [i for i in start_ids if i not in end_set]
+        rows = self._load_rows(added + removed)
+        added_df = pd.DataFrame([rows[i] for i in added], columns=end_columns, dtype="string")
+        removed_df = pd.DataFrame([rows[i] for i in removed], columns=start_columns, dtype="string")
+        return added_df, removed_df
+
+    def stats(self):
+        """Distinct rows, snapshots and total row references, for footprint checks."""
+        distinct = self.conn.execute("SELECT COUNT(*), SUM(LENGTH(data)) FROM rows").fetchone()
+        snaps = self.conn.execute(
+            "SELECT COUNT(*), SUM(row_count), SUM(LENGTH(members)) FROM snapshots"
+        ).fetchone()
+        return {
+            "distinct_rows": distinct[0],
+            "row_bytes": distinct[1] or 0,
+            "snapshots": snaps[0],
+            "row_references": snaps[1] or 0,
+            "membership_bytes": snaps[2] or 0,
+        }
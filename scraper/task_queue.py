@@ -0,0 +1,274 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+# Task states. "dead" tasks are pages that loaded but permanently lack the
+# vendor inputs, so retrying them would only waste a browser session.
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+DEAD = "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    lease_owner TEXT,
+    lease_expires REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, position);
+"""
+
+
+class TaskQueue:
+    """
+    Durable queue of enrichment tasks stored in a SQLite file, so a crashed or
+    interrupted run can be resumed and failures retried without re-scraping
+    the contracts that already succeeded.
+
+    Several workers (on one host or on hosts sharing the file) can pull from
+    the same queue. Each claim is a lease: if a worker dies, its tasks become
+    claimable again once the lease expires. Tasks are keyed by contract, and
+    a task that is already done ignores later results, so a task processed
+    twice after a lease expiry is merged once.
+    """
+
+    def __init__(self, path, max_attempts=None):
+        self.path = path
+        # A task whose lease expired this many times (its worker died, or the
+        # page hangs or crashes the browser) is failed instead of re-issued.
+        self.max_attempts = max_attempts
+        # Autocommit mode; writes go through _transaction so claims are atomic.
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two workers can't both
+        # select the same pending rows before either marks them in flight.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue(self, tasks):
+        """
+        Add (key, url) pairs as pending tasks. Keys already in the queue keep
+        their state, so enqueueing the same CSV from several hosts is safe.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            start = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (key, url, position, updated_at) VALUES (?, ?, ?, ?)",
+                [(key, url, start + i, now) for i, (key, url) in enumerate(tasks)],
+            )
+
+    def _claimable(self, now):
+        """WHERE clause and parameters selecting the tasks a claim may hand out."""
+        clause = "(state = ? OR (state = ? AND lease_expires < ?"
+        params = [PENDING, IN_FLIGHT, now]
+        if self.max_attempts is not None:
+            clause += " AND attempts < ?"
+            params.append(self.max_attempts)
+        return clause + "))", params
+
+    def _fail_exhausted_leases(self, conn, now):
+        if self.max_attempts is None:
+            return
+        conn.execute(
+            "UPDATE tasks SET state = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL,"
+            " updated_at = ? WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (
+                FAILED,
+                f"lease expired after {self.max_attempts} attempt(s)",
+                now,
+                IN_FLIGHT,
+                now,
+                self.max_attempts,
+            ),
+        )
+
+    def claim_batch(self, worker_id, batch_size, lease_seconds):
+        """
+        Lease up to batch_size tasks to worker_id. Pending tasks and in-flight
+        tasks whose lease has expired are both eligible; expired tasks that
+        already used max_attempts are failed instead.
+        Returns a list of (key, url).
+        """
+        now = time.time()
+        clause, params = self._claimable(now)
+        with self._transaction() as conn:
+            self._fail_exhausted_leases(conn, now)
+            rows = conn.execute(
+                f"SELECT key, url FROM tasks WHERE {clause} ORDER BY position LIMIT ?",
+                params + [batch_size],
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET state = ?, attempts = attempts + 1, lease_owner = ?,"
+                " lease_expires = ?, updated_at = ? WHERE key = ?",
+                [(IN_FLIGHT, worker_id, now + lease_seconds, now, key) for key, _ in rows],
+            )
+        return rows
+
+    def claimable_keys(self):
+        """Keys claim_batch could hand out right now (pending or lease expired), in order."""
+        clause, params = self._claimable(time.time())
+        rows = self.conn.execute(f"SELECT key FROM tasks WHERE {clause} ORDER BY position", params)
+        return [key for (key,) in rows]
+
+    def has_claimable(self):
+        """True if claim_batch would return at least one task."""
+        clause, params = self._claimable(time.time())
+        row = self.conn.execute(f"SELECT 1 FROM tasks WHERE {clause} LIMIT 1", params).fetchone()
+        return row is not None
+
+    def claim_keys(self, keys, worker_id, lease_seconds):
+        """
+        Lease the given tasks to worker_id, skipping any that another worker
+        claimed or finished meanwhile. Used by bulk passes that walk a fixed
+        list of keys, so a key they handed back is not claimed again by the
+        same pass. Returns a list of (key, url) in enqueue order.
+        """
+        keys = list(keys)
+        now = time.time()
+        clause, params = self._claimable(now)
+        rows = []
+        with self._transaction() as conn:
+            self._fail_exhausted_leases(conn, now)
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows += conn.execute(
+                    f"SELECT key, url FROM tasks WHERE key IN ({placeholders})"
+                    f" AND {clause} ORDER BY position",
+                    chunk + params,
+                ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET state = ?, attempts = attempts + 1, lease_owner = ?,"
+                " lease_expires = ?, updated_at = ? WHERE key = ?",
+                [(IN_FLIGHT, worker_id, now + lease_seconds, now, key) for key, _ in rows],
+            )
+        return rows
+
+    def extend_lease(self, keys, worker_id, lease_seconds):
+        """Push back the expiry of leases still held by worker_id."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ?"
+                " WHERE key = ? AND state = ? AND lease_owner = ?",
+                [(now + lease_seconds, now, key, IN_FLIGHT, worker_id) for key in keys],
+            )
+
+    def release(self, keys, worker_id):
+        """Hand leased tasks back as pending without counting an attempt."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET state = ?, attempts = attempts - 1, lease_owner = NULL,"
+                " lease_expires = NULL, updated_at = ? WHERE key = ? AND state = ? AND lease_owner = ?",
+                [(PENDING, now, key, IN_FLIGHT, worker_id) for key in keys],
+            )
+
+    def complete(self, key, result):
+        self._finish(key, DONE, result=result)
+
+    def fail(self, key, error):
+        self._finish(key, FAILED, error=error)
+
+    def dead_letter(self, key, error, result=None):
+        self._finish(key, DEAD, error=error, result=result)
+
+    def _finish(self, key, state, error=None, result=None):
+        # A result that arrives after another worker already finished the
+        # task (its lease had expired) is ignored.
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET state = ?, last_error = ?, result = ?, lease_owner = NULL,"
+                " lease_expires = NULL, updated_at = ? WHERE key = ? AND state NOT IN (?, ?)",
+                (
+                    state,
+                    error,
+                    json.dumps(result) if result is not None else None,
+                    time.time(),
+                    key,
+                    DONE,
+                    DEAD,
+                ),
+            )
+
+    def retry_failed(self, max_attempts=None):
+        """
+        Move failed tasks back to pending. Tasks that already used
+        max_attempts stay failed. Returns the number of requeued tasks.
+        """
+        query = "UPDATE tasks SET state = ?, updated_at = ? WHERE state = ?"
+        params = [PENDING, time.time(), FAILED]
+        if max_attempts is not None:
+            query += " AND attempts < ?"
+            params.append(max_attempts)
+        with self._transaction() as conn:
+            return conn.execute(query, params).rowcount
+
+    def counts(self):
+        """Return a dict of state -> number of tasks"""
+        rows = self.conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        return dict(rows)
+
+    def tasks(self, state=None):
+        """Return task rows as dicts, in enqueue order, optionally filtered by state"""
+        query = "SELECT key, url, state, attempts, last_error, result FROM tasks"
+        params = ()
+        if state is not None:
+            query += " WHERE state = ?"
+            params = (state,)
+        query += " ORDER BY position"
+        tasks = []
+        for key, url, task_state, attempts, last_error, result in self.conn.execute(query, params):
+            tasks.append(
+                {
+                    "key": key,
+                    "url": url,
+                    "state": task_state,
+                    "attempts": attempts,
+                    "last_error": last_error,
+                    "result": json.loads(result) if result else None,
+                }
+            )
+        return tasks
+
+    def results(self):
+        """Return a dict of key -> extracted fields for every task with a result"""
+        return {task["key"]: task["result"] for task in self.tasks() if task["result"] is not None}
+
+    def results_for(self, keys):
+        """Return a dict of key -> extracted fields for the given keys only"""
+        keys = list(keys)
+        found = {}
+        # Stay well under SQLite's bound-parameter limit.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, result FROM tasks WHERE result IS NOT NULL AND key IN ({placeholders})",
+                chunk,
+            )
+            for key, result in rows:
+                found[key] = json.loads(result)
+        return found
@@ -0,0 +1,163 @@
+import os
+
+import pandas as pd
+
+from normalize import ISSUE_COLUMNS, normalize_table
+
+# parse_currency/parse_number pick Int64 or Float64 from the values they see,
+# which differs between batches. The writer fixes these columns to Float64 so
+# every batch (and every parquet part) has the same schema.
+NUMERIC_TYPES = ("currency", "number")
+
+
+def _csv_number_text(values):
+    """Render a Float64 column for CSV with whole numbers written without ".0"."""
+    whole = (values % 1 == 0).fillna(False).astype(bool)
+    text = values.where(whole).astype("Int64").astype("string")
+    return text.fillna(values.astype("string"))
+
+
+class IncrementalWriter:
+    """
+    Append rows to an output file in batches as they are produced, so memory
+    doesn't grow with the size of the table.
+
+    Rows go to "<path>.partial" until finalize() renames it over <path>
+    atomically. Every flush writes whole rows and fsyncs, so if the process
+    dies the partial file is still a valid CSV (or, for parquet, a directory
+    of complete part files) holding everything flushed so far.
+
+    The column list is columns= or, without it, the first batch's columns.
+    Later batches may leave columns out (written as missing) but a batch
+    with a column outside the list raises ValueError.
+
+    If a schema is given, each batch is run through normalize_table and the
+    validation issues are kept (with row numbers relative to the whole file).
+    Currency and number columns are always Float64, so the output type of a
+    column doesn't depend on which values ended up in a batch.
+    """
+
+    def __init__(self, path, columns=None, schema=None, batch_size=500, file_format=None):
+        self.path = path
+        self.partial_path = f"{path}.partial"
+        self.columns = list(columns) if columns else None
+        self.schema = schema
+        self.batch_size = batch_size
+        self.file_format = file_format or ("parquet" if path.endswith(".parquet") else "csv")
+        if self.file_format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported output format: {self.file_format}")
+        self.rows_written = 0
+        self.issues = []
+        self._buffer = []
+        self._parts = 0
+        self._finalized = False
+
+        # Start from a clean partial file; a leftover one belongs to a dead run.
+        if self.file_format == "csv":
+            if os.path.exists(self.partial_path):
+                os.remove(self.partial_path)
+        else:
+            _pyarrow()
+            os.makedirs(self.partial_path, exist_ok=True)
+            for name in os.listdir(self.partial_path):
+                os.remove(os.path.join(self.partial_path, name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finalize()
+        else:
+            # Keep what we have; the partial file stays valid for inspection.
+            self.flush()
+        return False
+
+    def write(self, row):
+        """Buffer one row (a dict of column -> value)."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_frame(self, df):
+        """Write a DataFrame chunk straight through, flushing any buffered rows first."""
+        self.flush()
+        self._write_batch(df)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        batch = pd.DataFrame(self._buffer)
+        self._buffer = []
+        self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        if batch.empty:
+            return
+        if self.columns is None:
+            self.columns = list(batch.columns)
+        unexpected = [name for name in batch.columns if name not in self.columns]
+        if unexpected:
+            # The header is already on disk; widening it would misalign earlier rows.
+            raise ValueError(
+                f"{self.path}: batch has columns not in the output ({', '.join(map(str, unexpected))}); "
+                "pass columns= with the full column list"
+            )
+        batch = batch.reindex(columns=self.columns)
+        batch.index = range(self.rows_written, self.rows_written + len(batch))
+
+        if self.schema is not None:
+            batch, issues = normalize_table(batch, self.schema)
+            if not issues.empty:
+                self.issues.append(issues)
+            numeric = [
+                field["name"] for field in self.schema
+                if field["type"] in NUMERIC_TYPES and field["name"] in batch.columns
+            ]
+            for name in numeric:
+                batch[name] = batch[name].astype("Float64")
+
+        if self.file_format == "csv":
+            if self.schema is not None:
+                for name in numeric:
+                    batch[name] = _csv_number_text(batch[name])
+            with open(self.partial_path, "a", newline="", encoding="utf-8") as handle:
+                batch.to_csv(handle, index=False, header=self.rows_written == 0)
+                handle.flush()
+                os.fsync(handle.fileno())
+        else:
+            part_file = os.path.join(self.partial_path, f"part-{self._parts:05d}.parquet")
+            batch.to_parquet(f"{part_file}.tmp", index=False)
+            os.replace(f"{part_file}.tmp", part_file)
+            self._parts += 1
+        self.rows_written += len(batch)
+
+    def issues_frame(self):
+        """All validation issues seen so far as one DataFrame"""
+        if not self.issues:
+            return pd.DataFrame(columns=ISSUE_COLUMNS)
+        return pd.concat(self.issues, ignore_index=True)
+
+    def finalize(self):
+        """Flush remaining rows and atomically move the partial output into place."""
+        if self._finalized:
+            return self.path
+        self.flush()
+        if self.rows_written == 0 and self.file_format == "csv":
+            # Still produce a file with a header so readers don't trip over a missing output.
+            pd.DataFrame(columns=self.columns or []).to_csv(self.partial_path, index=False)
+        if self.file_format == "parquet" and os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                os.remove(os.path.join(self.path, name))
+            os.rmdir(self.path)
+        os.replace(self.partial_path, self.path)
+        self._finalized = True
+        return self.path
+
+
+def _pyarrow():
+    """Parquet output needs pyarrow, which the CSV-only paths don't."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scraper modules are run as scripts from scraper/, not installed as a package.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraper"))
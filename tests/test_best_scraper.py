@@ -0,0 +1,132 @@
+import os
+
+import pandas as pd
+import pytest
+
+from cli import SCRAPER_DIR, load_script
+from parsing import parse_pages, parse_tables
+
+bs4 = pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+
+scraper = load_script(os.path.join(SCRAPER_DIR, "best-scraper.py"), "best_scraper")
+
+LINK = "https://www.fpds.gov/ezsearch/jsp/viewLinkController.jsp?agencyID=9300&amp;PIID=91990021A0006&amp;modNumber=0"
+
+PAGE = f"""
+<html><head><title>Savings</title></head><body>
+<h2><span>Contracts</span></h2>
+<table>
+  <thead><tr><th>AGENCY</th><th>DESCRIPTION</th><th>UPLOADED ON</th><th>LINK</th><th>VALUE</th></tr></thead>
+  <tbody>
+  <tr>
+    <td title="Department of Education">Dept. of Ed.</td>
+    <td>IT <b>support</b> &amp; services</td>
+    <td>2/13/2025</td>
+    <td><a href="{LINK}">view</a></td>
+    <td> $440,000 </td>
+  </tr>
+  <tr>
+    <td>GSA</td>
+    <td>  Janitorial
+        services </td>
+    <td>2/14/2025</td>
+    <td>not in FPDS</td>
+    <td>$12.50</td>
+  </tr>
+  <tr><td>USDA</td><td></td><td>02/15/2025</td><td><a href="https://www.usaspending.gov/">search</a></td><td>$1.2M</td></tr>
+  </tbody>
+</table>
+<h2>Grants</h2>
+<table>
+  <tr><th>AGENCY</th><th>UPLOADED ON</th><th>VALUE</th></tr>
+  <tr><td>NSF</td><td>1/30/2025</td><td>$75,000</td></tr>
+</table>
+<h2>Real Estate</h2>
+<table>
+  <tr><th>MAIN AGENCY</th><th>LOCATION</th><th>SQ FT</th><th>ANNUAL LEASE</th></tr>
+  <tr><td>GSA</td><td><span><i>Washington</i>, DC</span></td><td>3,076</td><td>$98,000</td></tr>
+</table>
+<script>self.__next_f.push([1,"x"])</script>
+<script>{{"date":"2/13/2025","piid":"91990021A0006","agency":"Department of Education","ceiling_value":"$500,000","value":"$440,000","update_date":"2/14/2025","fpds_status":"Closed","fpds_link":"https://www.fpds.gov/x","vendor":"ACME","description":"IT support"}}</script>
+</body></html>
+"""
+
+
+def baseline_tables(html_text):
+    """The table parsing scrape_with_requests did before the parsing backends existed."""
+    soup = bs4.BeautifulSoup(html_text, "html.parser")
+    results = {}
+    for table_section in ["Contracts", "Grants", "Real Estate"]:
+        section = soup.find("h2", string=lambda t: t and table_section in t)
+        if not section:
+            continue
+        table = section.find_next("table")
+        if not table:
+            continue
+        headers_list = [th.text.strip() for th in table.find_all("th")]
+        rows = []
+        for tr in table.find_all("tr")[1:]:
+            row = {}
+            cells = tr.find_all("td")
+            for i, td in enumerate(cells):
+                if i < len(headers_list):
+                    if td.get("title"):
+                        row[headers_list[i]] = td.get("title")
+                    elif td.find("a"):
+                        row[headers_list[i]] = td.find("a")["href"]
+                    else:
+                        row[headers_list[i]] = td.text.strip()
+            if row:
+                rows.append(row)
+        results[table_section] = pd.DataFrame(rows)
+    return results
+
+
+def read_outputs(directory):
+    return {name: (directory / name).read_text() for name in sorted(os.listdir(directory))}
+
+
+@pytest.mark.parametrize("parser", ["lxml", "bs4"])
+def test_saved_results_match_the_baseline(tmp_path, parser):
+    baseline = baseline_tables(PAGE)
+    baseline["Embedded_Data"] = scraper.extract_embedded_json_improved(PAGE)
+    (tmp_path / "baseline").mkdir()
+    scraper.save_results(baseline, str(tmp_path / "baseline"))
+
+    results = scraper.tables_to_results(parse_tables(PAGE, parser), PAGE)
+    for name, frame in baseline.items():
+        pd.testing.assert_frame_equal(results[name], frame)
+    (tmp_path / parser).mkdir()
+    scraper.save_results(results, str(tmp_path / parser))
+
+    outputs = read_outputs(tmp_path / parser)
+    assert outputs == read_outputs(tmp_path / "baseline")
+    assert sorted(outputs) == [
+        "contracts_data.csv", "embedded_data_data.csv",
+        "grants_data.csv", "real_estate_data.csv",
+    ]
+
+
+def test_contract_cells():
+    results = scraper.tables_to_results(parse_tables(PAGE, "lxml"), PAGE)
+    contracts = results["Contracts"]
+    assert contracts["AGENCY"].tolist() == ["Department of Education", "GSA", "USDA"]
+    assert contracts["DESCRIPTION"].tolist() == ["IT support & services", "Janitorial\n        services", ""]
+    assert contracts["LINK"].tolist() == [
+        LINK.replace("&amp;", "&"), "not in FPDS", "https://www.usaspending.gov/",
+    ]
+    assert contracts["VALUE"].tolist() == ["$440,000", "$12.50", "$1.2M"]
+
+
+def test_parse_pages_across_processes(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"page{i}.html"
+        path.write_text(PAGE.replace("NSF", f"NSF-{i}"), encoding="utf-8")
+        paths.append(str(path))
+    parsed = parse_pages(paths, "lxml", workers=2)
+    assert [path for path, _ in parsed] == paths
+    for i, (path, tables) in enumerate(parsed):
+        assert tables == parse_tables(PAGE.replace("NSF", f"NSF-{i}"), "lxml")
+        assert tables["Grants"][0]["AGENCY"] == f"NSF-{i}"
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from entity_index import DEFAULT_COLUMNS, EntityIndex, build_index
+
+pytest.importorskip("numpy")
+
+
+def extract_line(uei, cage, name, dba="", structure="2L", naics="541511"):
+    values = [""] * (max(DEFAULT_COLUMNS.values()) + 1)
+    values[DEFAULT_COLUMNS["uei"]] = uei
+    values[DEFAULT_COLUMNS["cage"]] = cage
+    values[DEFAULT_COLUMNS["legal_business_name"]] = name
+    values[DEFAULT_COLUMNS["dba_name"]] = dba
+    values[DEFAULT_COLUMNS["entity_structure"]] = structure
+    values[DEFAULT_COLUMNS["primary_naics"]] = naics
+    return "|".join(values) + "!end\n"
+
+
+@pytest.fixture
+def index(tmp_path):
+    extract = tmp_path / "extract.dat"
+    extract.write_text(
+        "BOF PUBLIC V2 00000000 20250301 0000003 0000000\n"
+        + extract_line("PHV8CYF3CNS3", "1ABC2", "ACME CORP", dba="ACME")
+        + extract_line("ZQGGHJH74DW7", "", "NO CAGE LLC", structure="2K")
+        + extract_line("PHV8CYF3CNS3XX", "1ABC2XX", "TOO LONG INC")
+        + "EOF PUBLIC V2 00000000 20250301 0000003 0000000\n"
+    )
+    build_index(str(extract), str(tmp_path / "index"))
+    opened = EntityIndex(str(tmp_path / "index"))
+    yield opened
+    opened.close()
+
+
+def test_lookups(index):
+    assert len(index) == 3
+    assert index.by_uei("phv8cyf3cns3 ")["legal_business_name"] == "ACME CORP"
+    assert index.by_cage("1ABC2")["uei"] == "PHV8CYF3CNS3"
+    assert index.by_uei("UNKNOWN00000") is None
+    assert index.by_uei("") is None
+    assert index.enrichment_fields("ZQGGHJH74DW7") == {
+        "Organization Type": "PARTNERSHIP",
+        "Legal Business Name": "NO CAGE LLC",
+        "cage Code": None,
+        "Doing Business As Name": None,
+        "Unique Entity Identifier": "ZQGGHJH74DW7",
+    }
+
+
+def test_over_long_keys_never_match_a_truncated_key(index):
+    # Both keys of the third entity are wider than their index fields.
+    assert index.by_uei("PHV8CYF3CNS3XX") is None
+    assert index.by_cage("1ABC2XX") is None
+    assert index.by_uei("PHV8CYF3CNS3")["legal_business_name"] == "ACME CORP"
+    with open(f"{index.index_dir}/meta.json") as meta:
+        assert json.load(meta)["skipped_keys"] == {"uei": 1, "cage": 1}
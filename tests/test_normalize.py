@@ -0,0 +1,51 @@
+import pandas as pd
+
+from normalize import SCHEMAS, normalize_table, parse_currency, parse_date, parse_naics
+
+
+def test_parse_currency_whole_dollars_stay_integers():
+    parsed = parse_currency(pd.Series(["$1,234", " $ 12 ", "$440,000"]))
+    assert str(parsed.dtype) == "Int64"
+    assert parsed.tolist() == [1234, 12, 440000]
+
+
+def test_parse_currency_cents_suffixes_and_sign():
+    parsed = parse_currency(pd.Series(["$12.50", "$1.2M", "$3K", "$2B", "-$1,000", "1.5k"]))
+    assert str(parsed.dtype) == "Float64"
+    assert parsed.tolist() == [12.5, 1_200_000, 3_000, 2_000_000_000, -1000, 1500]
+
+
+def test_parse_currency_unparsable_and_empty_are_missing():
+    parsed = parse_currency(pd.Series(["n/a", "", None, "$5"]))
+    assert parsed.isna().tolist() == [True, True, True, False]
+
+
+def test_parse_naics_strips_float_artifacts():
+    parsed = parse_naics(pd.Series(["541519.0", " 541611 ", "54", "ABC", "1234567", None]))
+    assert parsed.tolist()[:3] == ["541519", "541611", "54"]
+    assert parsed.isna().tolist() == [False, False, False, True, True, True]
+
+
+def test_parse_date_accepts_page_and_iso_formats():
+    parsed = parse_date(pd.Series(["2/13/2025", "2025-02-26", "someday"]))
+    assert parsed.dt.strftime("%Y-%m-%d").tolist()[:2] == ["2025-02-13", "2025-02-26"]
+    assert parsed.isna().tolist() == [False, False, True]
+
+
+def test_normalize_table_reports_issues_without_dropping_rows():
+    df = pd.DataFrame(
+        {
+            "AGENCY": ["GSA", " "],
+            "DESCRIPTION": ["IT", "Leases"],
+            "UPLOADED ON": ["2/13/2025", "soon"],
+            "VALUE": ["$1,000", "$1.5M"],
+        }
+    )
+    normalized, issues = normalize_table(df, SCHEMAS["Contracts"])
+    assert len(normalized) == 2
+    assert normalized["VALUE"].tolist() == [1000, 1_500_000]
+    problems = set(zip(issues["column"], issues["row"].astype("object"), issues["problem"]))
+    assert ("AGENCY", 1, "missing value") in problems
+    assert ("UPLOADED ON", 1, "invalid date") in problems
+    assert ("LINK", None, "missing column") in problems
+    assert issues.loc[issues["column"] == "UPLOADED ON", "value"].tolist() == ["soon"]
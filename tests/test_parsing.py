@@ -0,0 +1,59 @@
+import pytest
+
+from parsing import parse_tables, parse_tables_bs4, parse_tables_lxml
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+
+PAGE = """
+<html><body>
+<h2><span>Contracts</span></h2>
+<table>
+  <tr><th>AGENCY</th><th> DESCRIPTION <script>var x = 1;</script></th><th>UPLOADED ON</th><th>LINK</th><th>VALUE</th></tr>
+  <tr>
+    <td title="Department of Education">Dept. of Ed.</td>
+    <td>IT <b>support</b> &amp; services<script>track("row")</script><style>td { color: red }</style><!-- note --></td>
+    <td>2/13/2025</td>
+    <td><a href="https://www.fpds.gov/ezsearch/jsp/viewLinkController.jsp?agencyID=9300&amp;PIID=1">view</a></td>
+    <td> $440,000 </td>
+  </tr>
+  <tr>
+    <td>GSA</td>
+    <td>No link</td>
+    <td>2/14/2025</td>
+    <td><a name="anchor-only">no href</a></td>
+    <td>$12.50</td>
+    <td>extra cell beyond the headers</td>
+  </tr>
+  <tr></tr>
+</table>
+<h2>Grants</h2>
+<p>No grants table follows until the next section.</p>
+<h2>Real Estate</h2>
+<table>
+  <tr><th>AGENCY</th><th>LOCATION</th></tr>
+  <tr><td>GSA</td><td><span><i>Washington</i>, DC</span></td></tr>
+</table>
+</body></html>
+"""
+
+
+def test_backends_produce_identical_rows():
+    assert parse_tables_lxml(PAGE) == parse_tables_bs4(PAGE)
+
+
+def test_cell_values():
+    tables = parse_tables(PAGE, "lxml")
+    first, second = tables["Contracts"]
+    assert first["AGENCY"] == "Department of Education"
+    assert first["DESCRIPTION"] == "IT support & services"
+    assert first["LINK"].endswith("agencyID=9300&PIID=1")
+    assert first["VALUE"] == "$440,000"
+    assert second["LINK"] == "no href"
+    assert "extra cell beyond the headers" not in second.values()
+    assert tables["Real Estate"] == [{"AGENCY": "GSA", "LOCATION": "Washington, DC"}]
+
+
+def test_grants_heading_uses_next_table():
+    # Both backends take the first table after the heading, even across sections.
+    assert parse_tables_lxml(PAGE)["Grants"] == parse_tables_bs4(PAGE)["Grants"]
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+import scheduler
+
+pytest.importorskip("requests")
+
+
+def test_failed_polls_are_recorded(tmp_path, capsys):
+    metrics_file = tmp_path / "watch_metrics.jsonl"
+    calls = []
+    scheduler.watch(
+        calls.append,
+        state_file=str(tmp_path / "watch_state.json"),
+        interval=0,
+        metrics_file=str(metrics_file),
+        # Nothing listens on port 9 (discard) locally, so the poll fails.
+        url="http://127.0.0.1:9/savings",
+        max_polls=2,
+    )
+    assert calls == []
+    assert "[ERROR] Polling" in capsys.readouterr().out
+    records = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    assert len(records) == 2
+    for record in records:
+        assert record["name"] == "watch-poll"
+        assert record["metrics"]["poll_errors"]["total"] == 1
+        assert record["metrics"]["poll_seconds"]["count"] == 1
+    assert json.loads((tmp_path / "watch_state.json").read_text())["validators"] == {}
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+import task_queue
+from task_queue import DONE, FAILED, IN_FLIGHT, PENDING, TaskQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = TaskQueue(str(tmp_path / "queue.sqlite"))
+    queue.enqueue([("a", "url-a"), ("b", "url-b"), ("c", "url-c")])
+    yield queue
+    queue.close()
+
+
+def states(queue):
+    return {task["key"]: (task["state"], task["attempts"]) for task in queue.tasks()}
+
+
+def test_enqueue_is_idempotent(queue):
+    queue.complete("a", {"x": 1})
+    queue.enqueue([("a", "url-a"), ("d", "url-d")])
+    assert states(queue)["a"] == (DONE, 0)
+    assert [task["key"] for task in queue.tasks()] == ["a", "b", "c", "d"]
+
+
+def test_claim_leases_tasks_in_order(queue):
+    assert queue.claim_batch("w1", 2, 60) == [("a", "url-a"), ("b", "url-b")]
+    assert queue.claim_batch("w2", 5, 60) == [("c", "url-c")]
+    assert queue.claim_batch("w3", 5, 60) == []
+    assert not queue.has_claimable()
+
+
+def test_expired_lease_is_reclaimable(queue):
+    queue.claim_batch("dead-worker", 3, 0.01)
+    time.sleep(0.05)
+    assert queue.has_claimable()
+    assert queue.claim_batch("w2", 3, 60) == [("a", "url-a"), ("b", "url-b"), ("c", "url-c")]
+    assert states(queue)["a"] == (IN_FLIGHT, 2)
+
+
+def test_live_lease_is_not_reissued(queue):
+    queue.claim_batch("w1", 3, 60)
+    assert queue.claim_batch("w2", 3, 60) == []
+
+
+def test_late_complete_after_done_is_ignored(queue):
+    queue.claim_batch("slow", 1, 0.01)
+    time.sleep(0.05)
+    queue.claim_batch("fast", 1, 60)
+    queue.complete("a", {"by": "fast"})
+    queue.complete("a", {"by": "slow"})
+    queue.fail("a", "slow worker timed out")
+    assert queue.results() == {"a": {"by": "fast"}}
+    assert states(queue)["a"][0] == DONE
+
+
+def test_release_does_not_count_an_attempt(queue):
+    queue.claim_batch("w1", 2, 60)
+    queue.release(["a", "b"], "w1")
+    assert states(queue)["a"] == (PENDING, 0)
+    # Only the lease holder can hand a task back.
+    queue.claim_batch("w1", 1, 60)
+    queue.release(["a"], "someone-else")
+    assert states(queue)["a"] == (IN_FLIGHT, 1)
+
+
+def test_claim_keys_skips_tasks_held_by_another_worker(queue):
+    queue.claim_batch("w1", 1, 60)
+    queue.complete("c", {"x": 1})
+    assert queue.claim_keys(["a", "b", "c"], "w2", 60) == [("b", "url-b")]
+
+
+def test_exhausted_expired_lease_is_failed(tmp_path):
+    queue = TaskQueue(str(tmp_path / "queue.sqlite"), max_attempts=2)
+    queue.enqueue([("a", "url-a")])
+    for _ in range(2):
+        assert queue.claim_batch("crashing-worker", 1, 0.01) == [("a", "url-a")]
+        time.sleep(0.05)
+    assert queue.claim_batch("w2", 1, 60) == []
+    task = queue.tasks(FAILED)[0]
+    assert task["attempts"] == 2
+    assert "lease expired" in task["last_error"]
+    assert queue.retry_failed(max_attempts=2) == 0
+    queue.close()
+
+
+def test_retry_failed_requeues_only_failed(queue):
+    queue.claim_batch("w1", 3, 60)
+    queue.fail("a", "boom")
+    queue.dead_letter("b", "no inputs")
+    assert queue.retry_failed() == 1
+    assert queue.counts() == {PENDING: 1, task_queue.DEAD: 1, IN_FLIGHT: 1}
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from normalize import SCHEMAS
+from writers import IncrementalWriter
+
+
+def test_rows_are_appended_in_batches_and_renamed_on_finalize(tmp_path):
+    path = tmp_path / "out.csv"
+    with IncrementalWriter(str(path), columns=["a", "b"], batch_size=2) as writer:
+        for i in range(5):
+            writer.write({"a": i, "b": i * 2})
+        assert (tmp_path / "out.csv.partial").exists()
+        assert not path.exists()
+    assert writer.rows_written == 5
+    assert pd.read_csv(path).to_dict("list") == {"a": [0, 1, 2, 3, 4], "b": [0, 2, 4, 6, 8]}
+
+
+def test_missing_columns_are_blank(tmp_path):
+    path = tmp_path / "out.csv"
+    with IncrementalWriter(str(path), batch_size=1) as writer:
+        writer.write({"a": 1, "b": 2})
+        writer.write({"a": 3})
+    assert pd.read_csv(path)["b"].isna().tolist() == [False, True]
+
+
+def test_unexpected_column_raises(tmp_path):
+    writer = IncrementalWriter(str(tmp_path / "out.csv"), batch_size=1)
+    writer.write({"a": 1})
+    with pytest.raises(ValueError, match="b"):
+        writer.write({"a": 2, "b": 3})
+
+
+def test_currency_dtype_does_not_depend_on_the_batch(tmp_path):
+    path = tmp_path / "contracts.csv"
+    rows = [
+        {"AGENCY": "GSA", "DESCRIPTION": "x", "UPLOADED ON": "2/13/2025", "LINK": "l", "VALUE": value}
+        for value in ["$440,000", "$12.50", "$1,000", "$3"]
+    ]
+    with IncrementalWriter(str(path), schema=SCHEMAS["Contracts"], batch_size=2) as writer:
+        for row in rows:
+            writer.write(row)
+    lines = path.read_text().splitlines()
+    assert [line.rsplit(",", 1)[1] for line in lines[1:]] == ["440000", "12.5", "1000", "3"]
+    assert lines[1].split(",")[2] == "2025-02-13"